@@ -0,0 +1,271 @@
+"""
+In-memory sales cube for the admin analytics page.
+
+Order items are held as parallel NumPy columns: numeric measures plus
+integer-coded dimensions. ``refresh()`` appends items above the id
+watermark, picks up lower ids from recent orders that committed late, and
+re-reads the status of items whose order changed since the last refresh, so
+only the first load scans the full history. Pivots are
+computed with boolean masks and ``np.bincount`` over the combined row/column
+codes, without touching the database.
+
+The cube is per process; ``get_sales_cube()`` returns the shared instance
+and refreshes it at most every ``ANALYTICS_REFRESH_SECONDS``.
+"""
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from customer.models import Order, OrderItem
+
+DIMENSIONS = {
+    "category": "Category",
+    "month": "Month",
+    "size": "Size",
+    "payment_method": "Payment method",
+    "status": "Item status",
+    "product": "Product",
+}
+
+MEASURES = {
+    "revenue": "Revenue",
+    "units": "Units",
+    "orders": "Orders",
+    "aov": "Average order value",
+}
+
+INACTIVE_STATUSES = ("cancelled", "returned")
+
+STATUS_OVERLAP = timedelta(minutes=5)
+
+_FIELDS = (
+    "id",
+    "order_id",
+    "order__created_at",
+    "product__main_category__name",
+    "product__name",
+    "inventory__size",
+    "order__payment_method",
+    "status",
+    "quantity",
+    "line_total",
+)
+
+
+class _Codes:
+    """Maps dimension labels to small integer codes, in first-seen order."""
+
+    def __init__(self):
+        self.labels = []
+        self.index = {}
+
+    def code(self, label):
+        label = "" if label is None else str(label)
+        code = self.index.get(label)
+        if code is None:
+            code = self.index[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class SalesCube:
+    def __init__(self):
+        self.codes = {dim: _Codes() for dim in DIMENSIONS}
+        self.item_id = np.empty(0, dtype=np.int64)
+        self.order_id = np.empty(0, dtype=np.int64)
+        self.dims = {dim: np.empty(0, dtype=np.int32) for dim in DIMENSIONS}
+        self.units = np.empty(0, dtype=np.int64)
+        self.revenue = np.empty(0, dtype=np.int64)
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.item_id)
+
+    def _month_label(self, created_at):
+        return timezone.localtime(created_at).strftime("%Y-%m")
+
+    def _encode(self, row):
+        (_, _, created_at, category, product, size, payment_method, status, _, _) = row
+        return (
+            self.codes["category"].code(category),
+            self.codes["month"].code(self._month_label(created_at)),
+            self.codes["size"].code(size),
+            self.codes["payment_method"].code(payment_method),
+            self.codes["status"].code(status),
+            self.codes["product"].code(product),
+        )
+
+    def refresh(self):
+        """Load new items and status changes since the previous refresh."""
+        with self.lock:
+            started = timezone.now()
+            watermark = int(self.item_id[-1]) if len(self) else 0
+
+            rows = list(
+                OrderItem.objects.filter(id__gt=watermark)
+                .annotate(line_total=F("price") * F("quantity"))
+                .order_by("id")
+                .values_list(*_FIELDS)
+                .iterator(chunk_size=5000)
+            )
+            late = []
+            if self.refreshed_at is not None and watermark:
+                late = self._late_rows(watermark)
+            self._append(late + rows)
+            if late:
+                order = np.argsort(self.item_id, kind="stable")
+                self.item_id = self.item_id[order]
+                self.order_id = self.order_id[order]
+                for dim in DIMENSIONS:
+                    self.dims[dim] = self.dims[dim][order]
+                self.units = self.units[order]
+                self.revenue = self.revenue[order]
+
+            if self.refreshed_at is not None and watermark:
+                self._refresh_statuses(watermark)
+            self.refreshed_at = started
+
+    def _late_rows(self, watermark):
+        """
+        Items below the watermark that are not in the cube yet: their
+        transaction committed after a refresh had already loaded higher ids.
+        Orders placed within STATUS_OVERLAP of the last refresh are re-scanned.
+        """
+        since = self.refreshed_at - STATUS_OVERLAP
+        recent = list(
+            OrderItem.objects.filter(id__lte=watermark, order__created_at__gte=since)
+            .annotate(line_total=F("price") * F("quantity"))
+            .order_by("id")
+            .values_list(*_FIELDS)
+        )
+        if not recent:
+            return []
+        ids = np.array([row[0] for row in recent], dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.item_id, ids), len(self) - 1)
+        missing = self.item_id[positions] != ids
+        return [row for row, is_missing in zip(recent, missing.tolist()) if is_missing]
+
+    def _append(self, rows):
+        if not rows:
+            return
+        encoded = np.array([self._encode(row) for row in rows], dtype=np.int32)
+        self.item_id = np.concatenate([self.item_id, [r[0] for r in rows]])
+        self.order_id = np.concatenate([self.order_id, [r[1] for r in rows]])
+        for column, dim in enumerate(DIMENSIONS):
+            self.dims[dim] = np.concatenate([self.dims[dim], encoded[:, column]])
+        self.units = np.concatenate([self.units, [r[8] for r in rows]])
+        self.revenue = np.concatenate([self.revenue, [r[9] for r in rows]])
+
+    def _refresh_statuses(self, watermark):
+        # Overlap the previous refresh a little to cover transactions that
+        # were still committing when it ran.
+        since = self.refreshed_at - STATUS_OVERLAP
+        changed = list(
+            OrderItem.objects.filter(
+                id__lte=watermark,
+                order__in=Order.objects.filter(updated_at__gte=since),
+            ).values_list("id", "status")
+        )
+        if not changed:
+            return
+        ids = np.array([item_id for item_id, _ in changed], dtype=np.int64)
+        positions = np.searchsorted(self.item_id, ids)
+        found = positions < len(self)
+        found[found] = self.item_id[positions[found]] == ids[found]
+        statuses = np.array(
+            [self.codes["status"].code(status) for _, status in changed], dtype=np.int32
+        )
+        self.dims["status"][positions[found]] = statuses[found]
+
+    def _mask(self, filters, include_inactive):
+        mask = np.ones(len(self), dtype=bool)
+        if not include_inactive:
+            inactive = [
+                self.codes["status"].index[s]
+                for s in INACTIVE_STATUSES
+                if s in self.codes["status"].index
+            ]
+            mask &= ~np.isin(self.dims["status"], inactive)
+        for dim, labels in filters.items():
+            wanted = [self.codes[dim].index[l] for l in labels if l in self.codes[dim].index]
+            mask &= np.isin(self.dims[dim], wanted)
+        return mask
+
+    def pivot(self, rows, columns=None, measure="revenue", filters=None, include_inactive=False):
+        """
+        Aggregate ``measure`` by the ``rows`` dimension and optionally by
+        ``columns``. Returns ``(row_labels, column_labels, values)`` where
+        ``values`` is a 2-D array; without ``columns`` it has one column.
+        Labels are sorted and only those with data are kept.
+        """
+        with self.lock:
+            if not len(self):
+                return [], [], np.zeros((0, 0))
+            mask = self._mask(filters or {}, include_inactive)
+            row_codes = self.dims[rows][mask]
+            n_rows = len(self.codes[rows].labels)
+            if columns:
+                col_codes = self.dims[columns][mask]
+                n_cols = len(self.codes[columns].labels)
+            else:
+                col_codes = np.zeros(len(row_codes), dtype=np.int32)
+                n_cols = 1
+            cells = row_codes.astype(np.int64) * n_cols + col_codes
+            size = n_rows * n_cols
+
+            if measure in ("orders", "aov"):
+                # Distinct orders per cell: unique (cell, order) pairs, counted per cell.
+                base = int(self.order_id.max()) + 1
+                pairs = np.unique(cells * base + self.order_id[mask])
+                orders = np.bincount(pairs // base, minlength=size)
+            if measure == "revenue":
+                values = np.bincount(cells, weights=self.revenue[mask], minlength=size)
+            elif measure == "units":
+                values = np.bincount(cells, weights=self.units[mask], minlength=size)
+            elif measure == "orders":
+                values = orders.astype(float)
+            else:
+                revenue = np.bincount(cells, weights=self.revenue[mask], minlength=size)
+                values = np.divide(revenue, orders, out=np.zeros(size), where=orders > 0)
+
+            present = np.bincount(cells, minlength=size).reshape(n_rows, n_cols) > 0
+            values = values.reshape(n_rows, n_cols)
+            row_keep = np.flatnonzero(present.any(axis=1))
+            col_keep = np.flatnonzero(present.any(axis=0))
+            row_labels = self.codes[rows].labels
+            row_keep = sorted(row_keep, key=lambda c: row_labels[c])
+            if columns:
+                col_labels = self.codes[columns].labels
+                col_keep = sorted(col_keep, key=lambda c: col_labels[c])
+                column_labels = [col_labels[c] for c in col_keep]
+            else:
+                column_labels = [MEASURES[measure]]
+            return (
+                [row_labels[r] for r in row_keep],
+                column_labels,
+                values[np.ix_(row_keep, col_keep)] if len(row_keep) and len(col_keep) else np.zeros((0, 0)),
+            )
+
+
+_cube = None
+_cube_lock = threading.Lock()
+
+
+def get_sales_cube():
+    global _cube
+    with _cube_lock:
+        if _cube is None:
+            _cube = SalesCube()
+        cube = _cube
+    if (
+        cube.refreshed_at is None
+        or time.time() - cube.refreshed_at.timestamp() >= settings.ANALYTICS_REFRESH_SECONDS
+    ):
+        cube.refresh()
+    return cube
@@ -0,0 +1,320 @@
+"""
+Bulk catalog import from CSV.
+
+Each row is one SKU. ``product``, ``category``, ``size``, ``price`` and
+``stock`` are required; ``description``, ``mrp`` and ``images`` (paths
+separated by ";", relative to the image root) describe the product and are
+taken from its first valid row. Rows for a product that already exists
+(same slug) add sizes to it and leave the product itself unchanged.
+
+The file is read as a stream, ``CHUNK_ROWS`` rows at a time. Each chunk is
+validated against the categories, products and sizes already stored, then
+its products and inventory are written with ``bulk_create`` in one
+savepoint. If that hits a duplicate key (a concurrent import, say), the
+chunk is inserted row by row instead so only the clashing rows fail. Images
+of new products are cropped in a process pool and their ProductImage rows
+bulk created after that. A bad row or image is recorded in the report and
+skipped; the rest of the file still imports.
+"""
+import codecs
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.text import slugify
+
+from aadmin import widgets
+from aadmin.models import CatalogImport
+from product.images import process_image
+from product.models import Category, Inventory, Product, ProductImage
+
+CHUNK_ROWS = 2000
+REQUIRED_COLUMNS = ("product", "category", "size", "price", "stock")
+IMAGE_DIR = "images/product_images"
+SIZES = {size for size, _ in Inventory.SIZE_CHOICES}
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.products_created = 0
+        self.inventory_created = 0
+        self.images_created = 0
+        self.errors = []
+
+    def error(self, row, message):
+        self.errors.append((row, message))
+
+    def error_lines(self):
+        return "\n".join(f"{row}: {message}" for row, message in self.errors)
+
+
+class _RowError(ValueError):
+    pass
+
+
+def _whole_number(value, field, minimum):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise _RowError(f"{field} must be a whole number")
+    if number < minimum:
+        raise _RowError(f"{field} must be at least {minimum}")
+    return number
+
+
+def _image_paths(value, image_root):
+    paths = []
+    for name in filter(None, (part.strip() for part in (value or "").split(";"))):
+        path = (image_root / name).resolve()
+        if not path.is_relative_to(image_root):
+            raise _RowError(f"image {name} is outside the image folder")
+        if not path.is_file():
+            raise _RowError(f"image {name} not found")
+        paths.append(path)
+    return paths
+
+
+def _parse_row(row, categories, image_root):
+    name = (row.get("product") or "").strip()
+    if len(name) < 3 or len(name) > 100:
+        raise _RowError("product name must be 3 to 100 characters")
+    slug = slugify(name)
+    if not slug:
+        raise _RowError("product name has no usable characters")
+
+    category_id = categories.get((row.get("category") or "").strip().lower())
+    if category_id is None:
+        raise _RowError(f"unknown category {row.get('category')!r}")
+
+    size = (row.get("size") or "").strip().upper()
+    if size not in SIZES:
+        raise _RowError(f"size must be one of {', '.join(sorted(SIZES))}")
+
+    description = (row.get("description") or "").strip()
+    if len(description) > 511:
+        raise _RowError("description is longer than 511 characters")
+
+    mrp = (row.get("mrp") or "").strip()
+    return {
+        "name": name,
+        "slug": slug,
+        "category_id": category_id,
+        "description": description,
+        "mrp": _whole_number(mrp, "mrp", 1) if mrp else None,
+        "size": size,
+        "price": _whole_number((row.get("price") or "").strip(), "price", 1),
+        "stock": _whole_number((row.get("stock") or "").strip(), "stock", 0),
+        "images": _image_paths(row.get("images"), image_root),
+    }
+
+
+def _product(slug, sku):
+    return Product(
+        name=sku["name"],
+        description=sku["description"],
+        main_category_id=sku["category_id"],
+        mrp=sku["mrp"],
+        slug=slug,
+    )
+
+
+def _inventory(product_id, sku):
+    return Inventory(
+        product_id=product_id, size=sku["size"], price=sku["price"], stock=sku["stock"]
+    )
+
+
+def _insert_rows(new_products, skus, product_ids, report):
+    """Row-by-row fallback for a chunk whose bulk insert failed; returns (products, sizes)."""
+    created = []
+    rejected = set()
+    for slug, (line, sku) in list(new_products.items()):
+        # Ids assigned by the rolled-back bulk insert are not valid any more.
+        product_ids.pop(slug, None)
+        try:
+            with transaction.atomic():
+                product = _product(slug, sku)
+                product.save()
+        except IntegrityError as exc:
+            del new_products[slug]
+            rejected.add(line)
+            report.error(line, f"product {slug} could not be saved: {exc}")
+        else:
+            created.append(product)
+            product_ids[slug] = product.id
+
+    inserted = 0
+    for line, sku in skus:
+        product_id = product_ids.get(sku["slug"])
+        if product_id is None:
+            if line not in rejected:
+                report.error(line, f"product {sku['slug']} was not created")
+            continue
+        try:
+            with transaction.atomic():
+                _inventory(product_id, sku).save()
+        except IntegrityError as exc:
+            report.error(line, f"{sku['slug']} size {sku['size']} could not be saved: {exc}")
+        else:
+            inserted += 1
+    return created, inserted
+
+
+def _import_chunk(chunk, categories, image_root, pool, report):
+    parsed = []
+    for line, row in chunk:
+        try:
+            parsed.append((line, _parse_row(row, categories, image_root)))
+        except _RowError as exc:
+            report.error(line, str(exc))
+
+    slugs = {sku["slug"] for _, sku in parsed}
+    existing = {
+        slug: (product_id, is_deleted)
+        for slug, product_id, is_deleted in Product.all_objects.filter(
+            slug__in=slugs
+        ).values_list("slug", "id", "is_deleted")
+    }
+    taken = set(
+        Inventory.objects.filter(
+            product_id__in=[product_id for product_id, _ in existing.values()]
+        ).values_list("product__slug", "size")
+    )
+
+    new_products = {}
+    skus = []
+    for line, sku in parsed:
+        slug = sku["slug"]
+        if existing.get(slug, (None, False))[1]:
+            report.error(line, f"product {slug} has been deleted; restore it first")
+            continue
+        if (slug, sku["size"]) in taken:
+            report.error(line, f"{slug} already has size {sku['size']}")
+            continue
+        taken.add((slug, sku["size"]))
+        if slug not in existing and slug not in new_products:
+            new_products[slug] = (line, sku)
+        skus.append((line, sku))
+
+    product_ids = {slug: product_id for slug, (product_id, _) in existing.items()}
+    try:
+        with transaction.atomic():
+            created = Product.objects.bulk_create(
+                [_product(slug, sku) for slug, (_, sku) in new_products.items()]
+            )
+            product_ids.update({product.slug: product.id for product in created})
+            Inventory.objects.bulk_create(
+                [_inventory(product_ids[sku["slug"]], sku) for _, sku in skus]
+            )
+            inserted = len(skus)
+    except IntegrityError:
+        # A concurrent import or edit took a slug; find the offending rows.
+        created, inserted = _insert_rows(new_products, skus, product_ids, report)
+    report.products_created += len(created)
+    report.inventory_created += inserted
+
+    tasks, owners = [], []
+    for slug, (line, sku) in new_products.items():
+        for source in sku["images"]:
+            name = f"{IMAGE_DIR}/{slug}-{uuid4()}{source.suffix.lower()}"
+            tasks.append((str(source), str(Path(settings.MEDIA_ROOT) / name)))
+            owners.append((line, product_ids[slug], name))
+    if not tasks:
+        return
+
+    results = pool.map(process_image, tasks, chunksize=8) if pool else map(process_image, tasks)
+    images = []
+    priorities = {}
+    for (line, product_id, name), (source, _), error in zip(owners, tasks, results):
+        if error:
+            report.error(line, f"image {Path(source).name}: {error}")
+            continue
+        priorities[product_id] = priorities.get(product_id, 0) + 1
+        images.append(ProductImage(product_id=product_id, image=name, priority=priorities[product_id]))
+    ProductImage.objects.bulk_create(images)
+    report.images_created += len(images)
+
+
+def import_catalog(csv_file, image_root, workers=None):
+    """
+    Import SKUs from ``csv_file`` (an open text file or any iterable of
+    lines), resolving image paths inside ``image_root``. ``workers=0`` crops
+    images in this process instead of a pool.
+    Returns an ImportReport; raises ValueError if required columns are missing.
+    """
+    reader = csv.DictReader(csv_file)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    categories = {}
+    for category_id, name, slug in Category.objects.values_list("id", Lower("name"), "slug"):
+        categories[slug] = categories[name] = category_id
+
+    image_root = Path(image_root).resolve()
+    os.makedirs(Path(settings.MEDIA_ROOT) / IMAGE_DIR, exist_ok=True)
+    report = ImportReport()
+    with ProcessPoolExecutor(workers) if workers != 0 else nullcontext() as pool:
+        chunk = []
+        for line, row in enumerate(reader, start=2):
+            chunk.append((line, row))
+            if len(chunk) == CHUNK_ROWS:
+                _import_chunk(chunk, categories, image_root, pool, report)
+                report.rows += len(chunk)
+                chunk = []
+        if chunk:
+            _import_chunk(chunk, categories, image_root, pool, report)
+            report.rows += len(chunk)
+    report.errors.sort()
+
+    if report.products_created or report.inventory_created:
+        widgets.invalidate_widgets("catalog")
+    return report
+
+
+def run_pending_imports(workers=None):
+    """Import every uploaded CatalogImport still pending; returns how many ran."""
+    ran = 0
+    while True:
+        with transaction.atomic():
+            record = (
+                CatalogImport.objects.select_for_update(skip_locked=True)
+                .filter(status="pending")
+                .order_by("id")
+                .first()
+            )
+            if record is None:
+                return ran
+            record.status = "running"
+            record.save(update_fields=["status"])
+
+        try:
+            with record.file.open("rb") as raw:
+                report = import_catalog(
+                    codecs.iterdecode(raw, "utf-8-sig"),
+                    settings.CATALOG_IMPORT_IMAGE_ROOT,
+                    workers,
+                )
+        except Exception as exc:
+            record.status = "failed"
+            record.errors = str(exc)
+        else:
+            record.status = "done"
+            record.rows = report.rows
+            record.products_created = report.products_created
+            record.inventory_created = report.inventory_created
+            record.images_created = report.images_created
+            record.error_count = len(report.errors)
+            record.errors = report.error_lines()
+        record.finished_at = timezone.now()
+        record.save()
+        ran += 1
@@ -0,0 +1,225 @@
+"""
+Streaming report and catalog exports.
+
+Rows are read with ``QuerySet.iterator()`` and encoded one chunk at a time,
+so memory use does not grow with the size of the export. XLSX output is a
+minimal SpreadsheetML package written through ``zipfile`` into a buffer
+that is drained after every chunk; no spreadsheet library is needed.
+``gzip_stream`` compresses any of these streams chunk by chunk.
+
+The catalog export has one row per product size (products without sizes
+get one row) with the product's primary image. Its CSV columns match the
+catalog import (aadmin/catalog_import.py), so an export can be imported
+again with the media folder as the image root.
+"""
+import csv
+import json
+import zipfile
+import zlib
+from datetime import datetime, time, timedelta
+from xml.sax.saxutils import escape
+
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from customer.models import OrderItem
+from product.models import Product, ProductImage
+
+CHUNK_SIZE = 2000
+
+SALES_COLUMNS = [
+    ("Order ID", "order_id"),
+    ("Order Date", "order__created_at"),
+    ("Item ID", "id"),
+    ("Product", "product__name"),
+    ("Category", "product__main_category__name"),
+    ("Size", "inventory__size"),
+    ("Customer", "order__customer__email"),
+    ("Quantity", "quantity"),
+    ("Unit Price", "price"),
+    ("Line Total", "line_total"),
+    ("Item Status", "status"),
+    ("Payment Method", "order__payment_method"),
+    ("Paid", "order__is_paid"),
+]
+
+CATALOG_COLUMNS = [
+    ("product_id", "id"),
+    ("product", "name"),
+    ("slug", "slug"),
+    ("category", "main_category__name"),
+    ("description", "description"),
+    ("mrp", "mrp"),
+    ("is_available", "is_available"),
+    ("approved", "approved"),
+    ("sku_id", "inventory_sizes__id"),
+    ("size", "inventory_sizes__size"),
+    ("price", "inventory_sizes__price"),
+    ("stock", "inventory_sizes__stock"),
+    ("is_active", "inventory_sizes__is_active"),
+    ("images", "primary_image"),
+]
+
+
+def sales_rows(start, end):
+    """Yield one tuple per order item for orders placed ``start``..``end`` (dates, inclusive)."""
+    tz = timezone.get_current_timezone()
+    since = timezone.make_aware(datetime.combine(start, time.min), tz)
+    until = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+    rows = (
+        OrderItem.objects.filter(order__created_at__gte=since, order__created_at__lt=until)
+        .annotate(line_total=F("price") * F("quantity"))
+        .order_by("order__created_at", "id")
+        .values_list(*(field for _, field in SALES_COLUMNS))
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for row in rows:
+        row = list(row)
+        row[1] = timezone.localtime(row[1], tz).strftime("%Y-%m-%d %H:%M")
+        yield row
+
+
+def catalog_rows():
+    """Yield one tuple per product size, ordered by product, with the primary image path."""
+    primary_image = (
+        ProductImage.objects.filter(product=OuterRef("pk"))
+        .order_by(F("priority").asc(nulls_last=True), "id")
+        .values("image")[:1]
+    )
+    return (
+        Product.objects.annotate(primary_image=Subquery(primary_image))
+        .order_by("id", "inventory_sizes__id")
+        .values_list(*(field for _, field in CATALOG_COLUMNS))
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+class _Buffer:
+    """Write-only file object whose contents are taken with ``drain()``."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(data.encode("utf-8") if isinstance(data, str) else bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def stream_csv(header, rows):
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % CHUNK_SIZE == 0:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def stream_jsonl(header, rows):
+    buffer = _Buffer()
+    for count, row in enumerate(rows, 1):
+        buffer.write(json.dumps(dict(zip(header, row)), ensure_ascii=False, default=str))
+        buffer.write("\n")
+        if count % CHUNK_SIZE == 0:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks as it is produced."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+CATALOG_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", stream_csv),
+    "jsonl": ("application/x-ndjson", stream_jsonl),
+}
+
+
+def stream_catalog(export_format="csv", compress=False):
+    """Byte chunks of the catalog export in ``export_format``, gzipped if ``compress``."""
+    header = [label for label, _ in CATALOG_COLUMNS]
+    chunks = CATALOG_FORMATS[export_format][1](header, catalog_rows())
+    return gzip_stream(chunks) if compress else chunks
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sales" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+def stream_xlsx(header, rows):
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            package.writestr(name, content)
+        yield buffer.drain()
+
+        with package.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(_xlsx_row(header).encode("utf-8"))
+            for count, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if count % CHUNK_SIZE == 0:
+                    yield buffer.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield buffer.drain()
@@ -0,0 +1,122 @@
+"""
+Per-SKU demand forecasts and reorder suggestions.
+
+``demand_matrix`` builds a SKU x day matrix of units sold (cancelled and
+returned items excluded) from one grouped query. ``fit_smoothing`` runs
+simple exponential smoothing for every SKU at once: each candidate alpha is
+a row of an (alphas, SKUs) level array updated one day at a time, and each
+SKU keeps the alpha with the lowest one-step-ahead squared error. The final
+level is the daily demand forecast; the error spread sets a safety stock.
+
+``forecast_demand`` turns these into days of cover and the quantity needed
+to hold ``lead_time + cover_days`` of demand plus safety stock, and upserts
+them into StockForecast for the admin inventory forecast page.
+"""
+import math
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from customer.models import OrderItem
+from customer.sales import INACTIVE_STATUSES
+from product.models import Inventory, StockForecast
+
+ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+WARMUP_DAYS = 7
+# Below this many units a day a SKU is treated as not selling.
+MIN_DAILY_DEMAND = 0.01
+
+
+def demand_matrix(inventory_ids, start, days):
+    """Units sold per SKU (rows follow the sorted ``inventory_ids``) per local day from ``start``."""
+    tz = timezone.get_current_timezone()
+    since = timezone.make_aware(datetime.combine(start, time.min), tz)
+    until = timezone.make_aware(datetime.combine(start + timedelta(days=days), time.min), tz)
+
+    sales = list(
+        OrderItem.objects.filter(
+            order__created_at__gte=since,
+            order__created_at__lt=until,
+            inventory__isnull=False,
+        )
+        .exclude(status__in=INACTIVE_STATUSES)
+        .annotate(day=TruncDate("order__created_at"))
+        .values("inventory_id", "day")
+        .annotate(units=Sum("quantity"))
+        .values_list("inventory_id", "day", "units")
+    )
+    matrix = np.zeros((len(inventory_ids), days))
+    if not sales:
+        return matrix
+    skus = np.array([row[0] for row in sales])
+    day_index = np.array([(row[1] - start).days for row in sales])
+    units = np.array([row[2] for row in sales], dtype=float)
+    rows = np.searchsorted(inventory_ids, skus)
+    known = (rows < len(inventory_ids)) & (inventory_ids[np.minimum(rows, len(inventory_ids) - 1)] == skus)
+    np.add.at(matrix, (rows[known], day_index[known]), units[known])
+    return matrix
+
+
+def fit_smoothing(matrix, alphas=ALPHAS):
+    """Return ``(level, sigma)`` per row: forecast daily demand and one-step error std."""
+    n_skus, n_days = matrix.shape
+    warmup = min(WARMUP_DAYS, n_days)
+    start = matrix[:, :warmup].mean(axis=1) if warmup else np.zeros(n_skus)
+    level = np.tile(start, (len(alphas), 1))
+    sse = np.zeros_like(level)
+    weights = alphas[:, None]
+    for day in range(warmup, n_days):
+        error = matrix[:, day] - level
+        sse += error ** 2
+        level += weights * error
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_skus)
+    steps = max(n_days - warmup, 1)
+    return level[best, columns], np.sqrt(sse[best, columns] / steps)
+
+
+def forecast_demand(history_days=120, lead_time=7, cover_days=14, service_z=1.65):
+    """Forecast every SKU from the last ``history_days`` full days; returns the SKU count."""
+    inventory = list(Inventory.objects.order_by("id").values_list("id", "stock"))
+    if not inventory:
+        return 0
+    inventory_ids = np.array([row[0] for row in inventory])
+    stock = np.array([row[1] for row in inventory], dtype=float)
+
+    start = timezone.localdate() - timedelta(days=history_days)
+    demand, sigma = fit_smoothing(demand_matrix(inventory_ids, start, history_days))
+
+    horizon = lead_time + cover_days
+    target = demand * horizon + service_z * sigma * math.sqrt(horizon)
+    reorder = np.maximum(np.ceil(target - stock), 0).astype(int)
+    selling = demand >= MIN_DAILY_DEMAND
+    cover = np.divide(stock, demand, out=np.zeros_like(stock), where=selling)
+
+    now = timezone.now()
+    StockForecast.objects.bulk_create(
+        [
+            StockForecast(
+                inventory_id=inventory_id,
+                daily_demand=round(daily, 3),
+                days_of_cover=round(days, 1) if sells else None,
+                reorder_quantity=quantity,
+                computed_at=now,
+            )
+            for inventory_id, daily, days, sells, quantity in zip(
+                inventory_ids.tolist(),
+                demand.tolist(),
+                cover.tolist(),
+                selling.tolist(),
+                reorder.tolist(),
+            )
+        ],
+        update_conflicts=True,
+        unique_fields=["inventory"],
+        update_fields=["daily_demand", "days_of_cover", "reorder_quantity", "computed_at"],
+        batch_size=2000,
+    )
+    return len(inventory)
@@ -0,0 +1,127 @@
+"""
+Bulk stock and price updates keyed by (product slug, size).
+
+Updates come from a CSV (``product`` slug, ``size`` and ``price`` and/or
+``stock``; blank cells are left alone) or from the bulk editor. They are
+applied in one transaction, ``CHUNK_SIZE`` keys at a time: each chunk is
+loaded with ``select_for_update``, compared with the new values, and the
+rows that differ are written with a single ``bulk_update``. The result is a
+diff report of every changed value plus the rows that were rejected.
+Catalog widgets are invalidated once per applied batch, not per row.
+
+The editor sends the values it displayed as ``expected``; a row whose
+price or stock has changed since (an order came in, say) is reported as a
+conflict instead of being overwritten.
+"""
+import csv
+
+from django.db import transaction
+from django.db.models import F
+
+from aadmin import widgets
+from product.models import Inventory
+
+CHUNK_SIZE = 1000
+FIELDS = ("price", "stock")
+MINIMUMS = {"price": 1, "stock": 0}
+
+
+class UpdateReport:
+    def __init__(self):
+        # (row, slug, size, field, old, new)
+        self.changes = []
+        self.unchanged = 0
+        self.errors = []
+
+    @property
+    def updated(self):
+        return len({(slug, size) for _, slug, size, _, _, _ in self.changes})
+
+
+def parse_values(raw):
+    """``{field: int}`` for the non-blank price/stock in ``raw``; raises ValueError."""
+    values = {}
+    for field in FIELDS:
+        value = (raw.get(field) or "").strip()
+        if not value:
+            continue
+        try:
+            values[field] = int(value)
+        except ValueError:
+            raise ValueError(f"{field} must be a whole number")
+        if values[field] < MINIMUMS[field]:
+            raise ValueError(f"{field} must be at least {MINIMUMS[field]}")
+    return values
+
+
+def read_update_csv(lines):
+    """
+    Parse an update CSV (open text file or iterable of lines) into
+    ``(updates, errors)``; updates are ``(row, slug, size, values, None)``.
+    """
+    reader = csv.DictReader(lines)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    if not {"product", "size"} <= set(reader.fieldnames) or not set(FIELDS) & set(reader.fieldnames):
+        raise ValueError("Columns product, size and price and/or stock are required")
+
+    updates, errors = [], []
+    for row, raw in enumerate(reader, start=2):
+        slug = (raw.get("product") or "").strip().lower()
+        size = (raw.get("size") or "").strip().upper()
+        try:
+            values = parse_values(raw)
+        except ValueError as exc:
+            errors.append((row, str(exc)))
+            continue
+        if values:
+            updates.append((row, slug, size, values, None))
+    return updates, errors
+
+
+def apply_inventory_updates(updates, dry_run=False):
+    """Apply ``(row, slug, size, values, expected)`` updates; returns an UpdateReport."""
+    report = UpdateReport()
+    seen = set()
+    with transaction.atomic():
+        for start in range(0, len(updates), CHUNK_SIZE):
+            chunk = updates[start:start + CHUNK_SIZE]
+            stored = {
+                (inventory.slug, inventory.size): inventory
+                for inventory in Inventory.objects.select_for_update(of=("self",))
+                .filter(product__slug__in={slug for _, slug, _, _, _ in chunk})
+                .annotate(slug=F("product__slug"))
+            }
+
+            changed = []
+            for row, slug, size, values, expected in chunk:
+                if (slug, size) in seen:
+                    report.errors.append((row, f"{slug} {size} appears more than once"))
+                    continue
+                seen.add((slug, size))
+                inventory = stored.get((slug, size))
+                if inventory is None:
+                    report.errors.append((row, f"{slug} has no size {size}"))
+                    continue
+                if expected and any(getattr(inventory, f) != v for f, v in expected.items()):
+                    report.errors.append((row, f"{slug} {size} was changed by someone else; reload and retry"))
+                    continue
+
+                diff = [
+                    (field, getattr(inventory, field), value)
+                    for field, value in values.items()
+                    if getattr(inventory, field) != value
+                ]
+                if not diff:
+                    report.unchanged += 1
+                    continue
+                for field, old, new in diff:
+                    setattr(inventory, field, new)
+                    report.changes.append((row, slug, size, field, old, new))
+                changed.append(inventory)
+
+            if changed and not dry_run:
+                Inventory.objects.bulk_update(changed, FIELDS)
+
+    if report.changes and not dry_run:
+        widgets.invalidate_widgets("catalog")
+    return report
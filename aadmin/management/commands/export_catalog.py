@@ -0,0 +1,29 @@
+"""
+Write the catalog export (see aadmin/exports.py) to a file or stdout, for
+backups and marketplace feeds run from cron.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+
+from aadmin.exports import CATALOG_FORMATS, stream_catalog
+
+
+class Command(BaseCommand):
+    help = "Export products, sizes and primary images as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(CATALOG_FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output.")
+        parser.add_argument("-o", "--output", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        chunks = stream_catalog(options["format"], options["gzip"])
+        if not options["output"]:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(options["output"], "wb") as output:
+            for chunk in chunks:
+                output.write(chunk)
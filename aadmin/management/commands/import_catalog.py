@@ -0,0 +1,56 @@
+"""
+Import products, sizes and images from a catalog CSV.
+
+Pass a file to import it directly (image paths are resolved relative to the
+file's folder unless ``--image-root`` is given), or ``--pending`` to run
+the CSVs uploaded from the admin catalog import page.
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aadmin.catalog_import import import_catalog, run_pending_imports
+
+
+class Command(BaseCommand):
+    help = "Bulk import catalog SKUs from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", nargs="?")
+        parser.add_argument("--image-root", help="Folder image paths are relative to.")
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Import the uploads waiting on the admin catalog import page.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Image processes (default: one per CPU; 0 processes images inline).",
+        )
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            ran = run_pending_imports(options["workers"])
+            self.stdout.write(f"Ran {ran} pending imports.")
+            return
+        if not options["csv_path"]:
+            raise CommandError("Give a CSV file or --pending.")
+
+        path = Path(options["csv_path"])
+        try:
+            with path.open(encoding="utf-8-sig", newline="") as csv_file:
+                report = import_catalog(
+                    csv_file, options["image_root"] or path.parent, options["workers"]
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for row, message in report.errors:
+            self.stderr.write(f"Row {row}: {message}")
+        self.stdout.write(
+            f"Read {report.rows} rows: created {report.products_created} products, "
+            f"{report.inventory_created} sizes and {report.images_created} images; "
+            f"{len(report.errors)} errors."
+        )
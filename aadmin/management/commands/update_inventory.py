@@ -0,0 +1,34 @@
+"""
+Apply stock and price changes from a CSV keyed by product slug and size.
+
+Prints one line per changed value; ``--dry-run`` shows the diff without
+writing it.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from aadmin.inventory_update import apply_inventory_updates, read_update_csv
+
+
+class Command(BaseCommand):
+    help = "Bulk update inventory stock and prices from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--dry-run", action="store_true", help="Report the diff without saving.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], encoding="utf-8-sig", newline="") as csv_file:
+                updates, errors = read_update_csv(csv_file)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        report = apply_inventory_updates(updates, dry_run=options["dry_run"])
+        for row, slug, size, field, old, new in report.changes:
+            self.stdout.write(f"Row {row}: {slug} {size} {field} {old} -> {new}")
+        for row, message in sorted(errors + report.errors):
+            self.stderr.write(f"Row {row}: {message}")
+        self.stdout.write(
+            f"{'Would update' if options['dry_run'] else 'Updated'} {report.updated} sizes, "
+            f"{report.unchanged} unchanged, {len(errors) + len(report.errors)} errors."
+        )
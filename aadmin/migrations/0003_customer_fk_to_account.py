@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Step 2 of the Customer proxy migration (see accounts 0005): point the
+    customer foreign keys at accounts_account. Customer ids equal account
+    ids, so the stored values are unchanged.
+    """
+
+    dependencies = [
+        ('accounts', '0004_mark_customer_accounts'),
+        ('aadmin', '0002_alter_categoryoffer_discount'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customercoupon',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.account'),
+        ),
+    ]
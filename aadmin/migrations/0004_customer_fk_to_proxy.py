@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Step 4 of the Customer proxy migration: point the foreign keys back at
+    Customer, which is now a proxy on the same table, so this is state-only.
+    """
+
+    dependencies = [
+        ('accounts', '0005_customer_proxy'),
+        ('aadmin', '0003_customer_fk_to_account'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='customercoupon',
+                    name='customer',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer'),
+                ),
+            ],
+        ),
+    ]
@@ -43,6 +43,36 @@ class CategoryOffer(models.Model):
         return "Offer for " + self.category.name + " - " + str(self.discount) + "%"
 
 
+class CatalogImport(models.Model):
+    """An uploaded catalog CSV, imported later by ``manage.py import_catalog --pending``."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    file = models.FileField(upload_to="imports/catalog")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    rows = models.PositiveIntegerField(default=0)
+    products_created = models.PositiveIntegerField(default=0)
+    inventory_created = models.PositiveIntegerField(default=0)
+    images_created = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # One "row: message" line per rejected row or image.
+    errors = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Catalog import {self.id} ({self.status})"
+
+
 
 
 
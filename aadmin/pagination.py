@@ -0,0 +1,88 @@
+"""
+Paginator for large admin tables.
+
+``Paginator.count`` runs an exact ``COUNT(*)`` over the filtered queryset on
+every page view. ``CachedCountPaginator`` caches the count per query (the
+SQL and its parameters) for ``PAGINATOR_COUNT_CACHE_SECONDS``, and on
+PostgreSQL asks the planner first: ``reltuples`` for an unfiltered table,
+otherwise the row estimate from ``EXPLAIN``. When that estimate is at least
+``PAGINATOR_ESTIMATE_THRESHOLD`` it is used instead of counting, and
+``approximate`` is set so templates can say "about N results".
+
+Approximate counts can be off in either direction, so the last pages may be
+empty or out of reach; use ``get_page()``, which clamps to the last page.
+Pass ``count_key`` when the query embeds values that change on every request
+(such as ``now()``), so the cached count is shared across them.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """Planner row estimate for ``queryset`` on PostgreSQL, or None."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where and not queryset.query.distinct:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+        else:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    if isinstance(row[0], int):
+        # reltuples is -1 until the table has been vacuumed or analyzed.
+        return row[0] if row[0] >= 0 else None
+    plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CachedCountPaginator(Paginator):
+    approximate = False
+
+    def __init__(self, object_list, per_page, *args, count_key=None, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.count_key = count_key
+
+    def _cache_key(self):
+        queryset = self.object_list
+        if self.count_key is not None:
+            signature = self.count_key
+        else:
+            sql, params = queryset.query.sql_with_params()
+            signature = f"{queryset.db}:{sql}:{params!r}"
+        digest = hashlib.sha1(signature.encode()).hexdigest()
+        return f"paginator:count:{queryset.model._meta.label_lower}:{digest}"
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        try:
+            key = self._cache_key()
+        except EmptyResultSet:
+            return 0
+        cached = cache.get(key)
+        if cached is None:
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= settings.PAGINATOR_ESTIMATE_THRESHOLD:
+                cached = (estimate, True)
+            else:
+                cached = (self.object_list.count(), False)
+            cache.set(key, cached, settings.PAGINATOR_COUNT_CACHE_SECONDS)
+        count, self.approximate = cached
+        return count
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.admin_dashboard, name="admin_dashboard"),
+    path('widgets/<slug:name>/', views.dashboard_widget, name="dashboard_widget"),
     path('customer-list/', views.customer_list, name="customer_list"),
     path('customer-approval/<pk>/', views.customer_approval, name="customer_approval"),    
     path('categories/', views.category_list, name="category_list"),
@@ -29,6 +30,9 @@ urlpatterns = [
     path("products/add/", views.product_form, name="add_product"),
     path("products/edit/<int:product_id>/", views.product_form, name="edit_product"),
     path('product/delete/<int:product_id>/', views.delete_product, name='delete_product'),
+    path('products/export/', views.catalog_export, name='catalog_export'),
+    path('products/import/', views.catalog_import, name='catalog_import'),
+    path('products/import/<int:import_id>/errors/', views.catalog_import_errors, name='catalog_import_errors'),
     
     
     path('product-approval/<pk>/', views.product_approval, name="product_approval"),
@@ -40,7 +44,10 @@ urlpatterns = [
         name="admin_order_detail",
     ),
     path('update-order-status/<int:order_item_id>/', views.update_order_status, name='update_order_status'),
+    path('bulk-update-order-status/', views.bulk_update_order_status, name='bulk_update_order_status'),
     path('sales-report/', views.sales_report, name="sales_report"),
+    path('sales-report/export/', views.sales_report_export, name="sales_report_export"),
+    path('sales-analytics/', views.sales_analytics, name="sales_analytics"),
     
     
     path('coupons/', views.coupon_list, name="coupon_list"),
@@ -58,6 +65,8 @@ urlpatterns = [
     path('inventory/add/', views.add_edit_inventory, name='add_inventory'),
     path('inventory/edit/<int:inventory_id>/', views.add_edit_inventory, name='edit_inventory'),
     path('inventory/list/', views.inventory_list, name='inventory_list'),
+    path('inventory/forecast/', views.inventory_forecast, name='inventory_forecast'),
+    path('inventory/bulk-update/', views.inventory_bulk_update, name='inventory_bulk_update'),
     path('inventory/status/<int:inventory_id>/', views.inventory_status, name='inventory_status'),
     path('inventory/delete/<int:inventory_id>/', views.delete_inventory, name='delete_inventory'),
     
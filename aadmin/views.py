@@ -2,12 +2,18 @@
 
 from django.shortcuts import render, redirect, get_object_or_404
 from accounts.models import Customer, Account
-from product.models import Category, Product, Inventory, ProductImage
+from product.models import Category, Product, Inventory, ProductImage, StockForecast
 from customer.models import OrderItem, Order
-from aadmin.models import Coupon, CategoryOffer
+from customer.utils import transition_order_items
+from aadmin.models import CatalogImport, Coupon, CategoryOffer
+from aadmin import analytics, exports, inventory_update, widgets
+from aadmin.pagination import CachedCountPaginator
+from django.conf import settings
 from django.utils.text import slugify
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
 from datetime import datetime, timedelta, date
 from django.db.models import Count, F, Sum
 from django.db.models.functions import Coalesce
@@ -15,6 +21,9 @@ from django.db import transaction
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db.models import Q
 import base64
+import codecs
+import csv
+import time
 from uuid import uuid4
 
 
@@ -85,153 +94,77 @@ def edit_admin_profile(request):
 
 @admin_login_required
 def admin_dashboard(request):
-    """Admin dashboard: top products/categories and revenue charts."""
-    title = "Dashboard"
-    current_page = "admin_dashboard"
-
-    top_products_info = (
-        OrderItem.objects.filter(product__isnull=False)
-        .values("product__id", "product__name")
-        .annotate(total_quantity=Coalesce(Sum("quantity"), 0))
-        .order_by("-total_quantity")[:5]
-    )
-
-    top_product_ids = [p["product__id"] for p in top_products_info]
-    products_by_id = {
-        p.id: p
-        for p in Product.objects.filter(id__in=top_product_ids).prefetch_related(
-            "product_images"
-        )
-    }
-    top_products = []
-    for info in top_products_info:
-        product = products_by_id.get(info["product__id"])
-        if not product:
-            continue
-        product.primary_image = product.product_images.order_by("priority").first()
-        product.total_quantity = info["total_quantity"]
-        top_products.append(product)
-
-    top_categories_info = (
-        Product.objects.filter(main_category__isnull=False)
-        .values("main_category__id")
-        .annotate(total_quantity=Coalesce(Sum("orderitem__quantity"), 0))
-        .order_by("-total_quantity")[:10]
-    )
-
-    top_category_ids = [c["main_category__id"] for c in top_categories_info]
-    categories_by_id = {c.id: c for c in Category.objects.filter(id__in=top_category_ids)}
-    top_categories = []
-    for info in top_categories_info:
-        category = categories_by_id.get(info["main_category__id"])
-        if not category:
-            continue
-        category.total_quantity = info["total_quantity"]
-        top_categories.append(category)
-
-    # Line chart for revenue for last year
-
-    end_date = date.today()
-    start_date = end_date - timedelta(days=365)
-    months = []
-    revenue_by_month = []
-
-    current_date = start_date
-    while current_date <= end_date:
-        month_start_date = current_date.replace(day=1)
-        next_month_start_date = (
-            current_date.replace(day=1) + timedelta(days=32)
-        ).replace(day=1)
-
-        month_label = month_start_date.strftime("%b")
-
-        total_revenue = Order.objects.filter(
-            created_at__gte=month_start_date, created_at__lt=next_month_start_date
-        ).aggregate(total=Sum("total_amount"))["total"]
-
-        months.append(month_label)
-        revenue_by_month.append(total_revenue or 0)
-
-        current_date = next_month_start_date
-
-    total_yearly_revenue = sum(revenue_by_month)
-
-    # Line chart for the month
-
-    today = date.today()
-    start_date = today.replace(day=1)
-    end_date = today
-
-    days = []
-    revenue_by_day = []
-
-    current_date = start_date
-    while current_date <= end_date:
-        total_revenue = Order.objects.filter(created_at__date=current_date).aggregate(
-            total=Sum("total_amount")
-        )["total"]
-
-        days.append(current_date.day)
-        revenue_by_day.append(total_revenue or 0)
-
-        current_date += timedelta(days=1)
-
-    total_monthly_revenue = sum(revenue_by_day)
-
-    # To count the orders according to the status
-    status_counts = {
-        "pending": OrderItem.objects.filter(status="pending").count(),
-        "confirmed": OrderItem.objects.filter(status="confirmed").count(),
-        "shipped": OrderItem.objects.filter(status="shipped").count(),
-        "delivered": OrderItem.objects.filter(status="delivered").count(),
-        "cancelled": OrderItem.objects.filter(status="cancelled").count(),
-    }
-
+    """Admin dashboard shell; each widget loads from ``dashboard_widget``."""
     context = {
-        "current_page": current_page,
-        "title": title,
-        "top_products": top_products,
-        "top_categories": top_categories,
-        "months": months,
-        "revenue_by_month": revenue_by_month,
-        "days": days,
-        "revenue_by_day": revenue_by_day,
-        "total_yearly_revenue": total_yearly_revenue,
-        "total_monthly_revenue": total_monthly_revenue,
-        "status_counts": status_counts,
-        "total_orders": OrderItem.objects.all().count(),
+        "current_page": "admin_dashboard",
+        "title": "Dashboard",
     }
     return render(request, "aadmin/admin-dashboard.html", context)
 
 
+@admin_login_required
+def dashboard_widget(request, name):
+    """JSON data for one dashboard widget, cached per widget (see aadmin/widgets.py)."""
+    if name not in widgets.WIDGETS:
+        raise Http404
+    return JsonResponse(widgets.get_widget(name))
+
+
+CUSTOMER_SORTS = {
+    "newest": ("-date_joined",),
+    "orders": (F("stats__order_count").desc(nulls_last=True), "-id"),
+    "lifetime_value": (F("stats__lifetime_value").desc(nulls_last=True), "-id"),
+    "last_order": (F("stats__last_order_at").desc(nulls_last=True), "-id"),
+}
+
+
+def _customer_search(term):
+    """Prefix match on indexed columns, normalised the way signup stores them."""
+    query = (
+        Q(email__startswith=term.lower())
+        | Q(first_name__startswith=term.title())
+        | Q(last_name__startswith=term.title())
+    )
+    if term.isdigit():
+        query |= Q(mobile__startswith=term)
+    return query
+
+
 @admin_login_required
 def customer_list(request):
+    """Paginated customer list with search, status filter and lifetime metrics."""
     title = "Customers"
     current_page = "customer_list"
 
-    customers = Customer.objects.all()
-    request.session["selection"] = "all"
-
-    if request.method == "POST":
-        filter_option = request.POST.get("filter_option")
-
-        if filter_option == "banned":
-            customers = Customer.objects.filter(is_active=False)
-            request.session["selection"] = "ban"
+    search_query = request.GET.get("search", "").strip()
+    filter_option = request.GET.get("filter_option", "all")
+    sort = request.GET.get("sort", "newest")
+    if sort not in CUSTOMER_SORTS:
+        sort = "newest"
+
+    customers = Customer.objects.select_related("stats")
+    if filter_option == "banned":
+        customers = customers.filter(is_active=False)
+    elif filter_option == "active":
+        customers = customers.filter(is_active=True)
+    if search_query:
+        customers = customers.filter(_customer_search(search_query))
+    customers = customers.order_by(*CUSTOMER_SORTS[sort])
 
-        elif filter_option == "active":
-            customers = Customer.objects.filter(is_active=True)
-            request.session["selection"] = "active"
+    paginator = CachedCountPaginator(customers, 20)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     context = {
-        "customers": customers,
+        "customers": page_obj,
         "current_page": current_page,
         "title": title,
+        "search_query": search_query,
+        "filter_option": filter_option,
+        "sort": sort,
     }
     return render(request, "aadmin/customer-list.html", context)
 
 
-
 @admin_login_required
 def customer_approval(request, pk):
     customer = Customer.objects.get(pk=pk)
@@ -265,19 +198,19 @@ def category_list(request):
     if search_query:
         categories = categories.filter(name__icontains=search_query)
 
+    paginator = CachedCountPaginator(categories, 5)
+    page_number = request.GET.get("page")
+    page_obj = paginator.get_page(page_number)
+
     counts_by_category_id = {
         row["main_category_id"]: row["count"]
-        for row in Product.all_objects.values("main_category_id").annotate(
-            count=Count("id")
-        )
+        for row in Product.all_objects.filter(
+            main_category_id__in=[category.id for category in page_obj]
+        ).values("main_category_id").annotate(count=Count("id"))
     }
-    for category in categories:
+    for category in page_obj:
         category.count = counts_by_category_id.get(category.id, 0)
 
-    paginator = Paginator(categories, 5)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
     context = {
         "categories": page_obj,
         "title": title,
@@ -387,6 +320,7 @@ def edit_category(request, slug):
             category.image = category_image
 
         category.save()
+        widgets.invalidate_widgets("catalog")
         messages.success(request, "Category updated successfully")
         return redirect("category_list")
 
@@ -455,7 +389,7 @@ def product_list(request):
             Q(mrp__icontains=search_query)
         )
 
-    paginator = Paginator(products, 5)
+    paginator = CachedCountPaginator(products, 5)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
@@ -546,6 +480,7 @@ def product_form(request, product_id=None):
 
             ProductImage.objects.create(product=product, image=image_file)
 
+        widgets.invalidate_widgets("catalog")
         messages.success(
             request,
             "Product updated successfully" if is_edit else "Product added successfully"
@@ -571,6 +506,7 @@ def remove_product_image(request, image_id):
     image = get_object_or_404(ProductImage, id=image_id)
     if request.method == "POST":
         image.delete()
+        widgets.invalidate_widgets("catalog")
         messages.success(request, "Image removed successfully.")
     return redirect("edit_product", product_id=image.product.id)
 
@@ -578,10 +514,62 @@ def remove_product_image(request, image_id):
 def delete_product(request, product_id):
     product = get_object_or_404(Product, id=product_id)
     product.delete()
+    widgets.invalidate_widgets("catalog")
     messages.success(request, "Product deleted successfully.")
     return redirect("product_list")
 
 
+@admin_login_required
+def catalog_export(request):
+    """Stream every product size with its primary image as CSV or JSON Lines (``?gzip=1`` compresses)."""
+    export_format = request.GET.get("format", "csv")
+    if export_format not in exports.CATALOG_FORMATS:
+        export_format = "csv"
+    compress = request.GET.get("gzip") == "1"
+
+    content_type = "application/gzip" if compress else exports.CATALOG_FORMATS[export_format][0]
+    response = StreamingHttpResponse(
+        exports.stream_catalog(export_format, compress), content_type=content_type
+    )
+    filename = f"amart-catalog-{date.today():%d-%m-%Y}.{export_format}{'.gz' if compress else ''}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@admin_login_required
+def catalog_import(request):
+    """Upload a catalog CSV for ``manage.py import_catalog --pending`` and list recent imports."""
+    if request.method == "POST":
+        upload = request.FILES.get("csv_file")
+        if not upload or not upload.name.lower().endswith(".csv"):
+            messages.error(request, "Please choose a .csv file")
+        else:
+            CatalogImport.objects.create(file=upload)
+            messages.success(request, "Catalog file uploaded; it will be imported shortly")
+        return redirect("catalog_import")
+
+    return render(request, "aadmin/catalog-import.html", {
+        "current_page": "product_list",
+        "title": "Catalog Import",
+        "imports": CatalogImport.objects.order_by("-id")[:20],
+        "image_root": settings.CATALOG_IMPORT_IMAGE_ROOT,
+    })
+
+
+@admin_login_required
+def catalog_import_errors(request, import_id):
+    """Download the rejected rows of a catalog import as CSV."""
+    record = get_object_or_404(CatalogImport, id=import_id)
+    response = HttpResponse(content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="catalog-import-{record.id}-errors.csv"'
+    writer = csv.writer(response)
+    writer.writerow(["Row", "Error"])
+    for line in record.errors.splitlines():
+        row, _, message = line.partition(": ")
+        writer.writerow([row, message])
+    return response
+
+
 @admin_login_required
 def product_approval(request, pk):
     product = Product.objects.get(pk=pk)
@@ -594,6 +582,19 @@ def product_approval(request, pk):
 
 
 
+def _filtered_order_items(search_query, filter_option):
+    """Order items matching the order list's search box and status filter."""
+    order_items = OrderItem.objects.all()
+
+    if search_query:
+        order_items = order_items.filter(product__name__icontains=search_query)
+
+    if filter_option != "all":
+        order_items = order_items.filter(status=filter_option)
+
+    return order_items
+
+
 @admin_login_required
 def order_list(request):
     title = "Orders"
@@ -602,34 +603,21 @@ def order_list(request):
     filter_option = request.GET.get("filter_option", "all")
     search_query = request.GET.get("search", "")
 
-    # Filter orders based on search query
-    order_items = OrderItem.objects.all().select_related(
+    order_items = _filtered_order_items(search_query, filter_option).select_related(
         "order", "product", "inventory", "order__customer"
-    ).order_by('-id') 
-
-    if search_query:
-        order_items = order_items.filter(product__name__icontains=search_query)
-
-    # Filter orders based on status
-    if filter_option != "all":
-        order_items = order_items.filter(status=filter_option)
-
-    paginator = Paginator(order_items, 5)
-    page = request.GET.get("page")
+    ).order_by('-id')
 
-    try:
-        order_items = paginator.page(page)
-    except PageNotAnInteger:
-        order_items = paginator.page(1)
-    except EmptyPage:
-        order_items = paginator.page(paginator.num_pages)
+    paginator = CachedCountPaginator(order_items, 5)
+    order_items = paginator.get_page(request.GET.get("page"))
 
     context = {
         "order_items": order_items,
+        "page_range": paginator.get_elided_page_range(order_items.number, on_each_side=2),
         "current_page": current_page,
         "title": title,
         "search_query": search_query,
         "filter_option": filter_option,
+        "bulk_actions": BULK_ORDER_ACTIONS,
     }
     return render(request, "aadmin/order-list.html", context=context)
 
@@ -672,15 +660,89 @@ def admin_order_detail(request, order_id):
 def update_order_status(request, order_item_id):
     if request.method == "POST":
         new_status = request.POST.get("new_status")
-        order_item = get_object_or_404(OrderItem, id=order_item_id)
-        order_item.status = new_status
-        order_item.save()
-        messages.success(
-            request, f"Status for order item {order_item_id} updated to {new_status}"
-        )
+        get_object_or_404(OrderItem, id=order_item_id)
+        if transition_order_items([order_item_id], new_status):
+            messages.success(
+                request, f"Status for order item {order_item_id} updated to {new_status}"
+            )
+        else:
+            messages.error(
+                request, f"Order item {order_item_id} cannot be moved to {new_status}"
+            )
     return redirect("order_list")
 
 
+BULK_ORDER_ACTIONS = [
+    ("confirmed", "Confirm"),
+    ("shipped", "Ship"),
+    ("delivered", "Deliver"),
+    ("cancelled", "Cancel"),
+]
+
+# Order items transitioned per transaction by a bulk action.
+BULK_ORDER_CHUNK = 500
+
+
+def _order_item_id_chunks(order_items, size=BULK_ORDER_CHUNK):
+    """Yield the ids of ``order_items`` in ascending lists of at most ``size``."""
+    last_id = 0
+    while True:
+        ids = list(
+            order_items.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+@admin_login_required
+def bulk_update_order_status(request):
+    """Apply one status transition to the selected (or all matching) order items."""
+    filter_option = request.POST.get("filter_option", "all")
+    search_query = request.POST.get("search", "")
+    list_url = "{}?{}".format(
+        reverse("order_list"),
+        urlencode({"search": search_query, "filter_option": filter_option}),
+    )
+
+    if request.method != "POST":
+        return redirect(list_url)
+
+    new_status = request.POST.get("new_status")
+    if new_status not in dict(BULK_ORDER_ACTIONS):
+        messages.error(request, "Please choose a valid action.")
+        return redirect(list_url)
+
+    if request.POST.get("apply_to") == "all_matching":
+        chunks = _order_item_id_chunks(_filtered_order_items(search_query, filter_option))
+    else:
+        order_item_ids = sorted(
+            {int(pk) for pk in request.POST.getlist("order_item_ids") if pk.isdigit()}
+        )
+        chunks = (
+            order_item_ids[start:start + BULK_ORDER_CHUNK]
+            for start in range(0, len(order_item_ids), BULK_ORDER_CHUNK)
+        )
+
+    matched = updated = 0
+    for chunk in chunks:
+        matched += len(chunk)
+        updated += transition_order_items(chunk, new_status)
+
+    if not matched:
+        messages.error(request, "No order items selected.")
+        return redirect(list_url)
+
+    skipped = matched - updated
+    messages.success(request, f"{updated} order item(s) moved to {new_status}.")
+    if skipped:
+        messages.warning(
+            request, f"{skipped} order item(s) skipped: transition not allowed."
+        )
+    return redirect(list_url)
+
+
 
 
 @admin_login_required
@@ -742,22 +804,22 @@ def sales_report(request):
     )
     order_items = order_items.order_by("-order_created_at")
 
-    paginator = Paginator(order_items, 10)
-    page = request.GET.get("page")
-    try:
-        order_items_paginated = paginator.page(page)
-    except PageNotAnInteger:
-        order_items_paginated = paginator.page(1)
-    except EmptyPage:
-        order_items_paginated = paginator.page(paginator.num_pages)
+    # The default ranges end at now(), so key the cached count on the selection.
+    paginator = CachedCountPaginator(
+        order_items,
+        10,
+        count_key="sales-report:{}:{}:{}".format(
+            request.session["selection"], start_date.date(), end_date.date()
+        ),
+    )
+    order_items_paginated = paginator.get_page(request.GET.get("page"))
 
-    overall_amount = (
-        order_items.aggregate(total=Sum(F("inventory__price") * F("quantity")))[
-            "total"
-        ]
-        or 0
+    # The paginator's count may be cached or estimated; the summary is exact.
+    summary = order_items.aggregate(
+        total=Sum(F("inventory__price") * F("quantity")), count=Count("id")
     )
-    overall_count = order_items.count()
+    overall_amount = summary["total"] or 0
+    overall_count = summary["count"]
 
     start_date_str = start_date.strftime("%d-%m-%Y")
     end_date_str = end_date.strftime("%d-%m-%Y")
@@ -781,6 +843,93 @@ def sales_report(request):
 
 
 
+@admin_login_required
+def sales_report_export(request):
+    """Stream every order item in ``?start=&end=`` (YYYY-MM-DD) as CSV or XLSX."""
+    try:
+        start = date.fromisoformat(request.GET.get("start", ""))
+        end = date.fromisoformat(request.GET.get("end", ""))
+    except ValueError:
+        messages.error(request, "Invalid date format.")
+        return redirect("sales_report")
+    if start > end:
+        messages.error(request, "Start date cannot be after end date!")
+        return redirect("sales_report")
+
+    export_format = request.GET.get("format", "csv")
+    header = [label for label, _ in exports.SALES_COLUMNS]
+    rows = exports.sales_rows(start, end)
+    if export_format == "xlsx":
+        response = StreamingHttpResponse(
+            exports.stream_xlsx(header, rows),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+    else:
+        export_format = "csv"
+        response = StreamingHttpResponse(
+            exports.stream_csv(header, rows), content_type="text/csv; charset=utf-8"
+        )
+    filename = f"amart-sales-report-{start:%d-%m-%Y}-{end:%d-%m-%Y}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+
+
+@admin_login_required
+def sales_analytics(request):
+    """Ad-hoc pivots over order items, served from the in-memory sales cube."""
+    rows = request.GET.get("rows", "category")
+    columns = request.GET.get("columns", "month")
+    measure = request.GET.get("measure", "revenue")
+    if rows not in analytics.DIMENSIONS:
+        rows = "category"
+    if columns not in analytics.DIMENSIONS or columns == rows:
+        columns = ""
+    if measure not in analytics.MEASURES:
+        measure = "revenue"
+    include_inactive = request.GET.get("include_inactive") == "on"
+    filters = {
+        dim: request.GET.getlist(f"filter_{dim}")
+        for dim in analytics.DIMENSIONS
+        if request.GET.getlist(f"filter_{dim}")
+    }
+
+    cube = analytics.get_sales_cube()
+    started = time.perf_counter()
+    row_labels, column_labels, values = cube.pivot(
+        rows, columns or None, measure, filters, include_inactive
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    additive = measure in ("revenue", "units") and bool(columns)
+    table = [
+        (label, [round(v, 2) for v in values[i]], round(values[i].sum(), 2) if additive else None)
+        for i, label in enumerate(row_labels)
+    ]
+
+    context = {
+        "current_page": "sales_analytics",
+        "title": "Sales Analytics",
+        "dimensions": analytics.DIMENSIONS,
+        "measures": analytics.MEASURES,
+        "rows": rows,
+        "columns": columns,
+        "measure": measure,
+        "row_label": analytics.DIMENSIONS[rows],
+        "include_inactive": include_inactive,
+        "column_labels": column_labels,
+        "table": table,
+        "column_totals": [round(v, 2) for v in values.sum(axis=0)] if additive and table else None,
+        "item_count": len(cube),
+        "refreshed_at": cube.refreshed_at,
+        "elapsed_ms": elapsed_ms,
+    }
+    return render(request, "aadmin/sales-analytics.html", context)
+
+
+
+
 @admin_login_required
 def coupon_list(request):
     title = "Coupons"
@@ -1109,7 +1258,7 @@ def inventory_list(request):
     ).order_by('-id')
 
 
-    paginator = Paginator(inventory, 5)  
+    paginator = CachedCountPaginator(inventory, 5)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
@@ -1120,6 +1269,110 @@ def inventory_list(request):
     return render(request, "aadmin/inventory-list.html", context)
 
 
+FORECAST_SORTS = {
+    "cover": (F("days_of_cover").asc(nulls_last=True), "inventory_id"),
+    "reorder": ("-reorder_quantity", "inventory_id"),
+    "demand": ("-daily_demand", "inventory_id"),
+    "stock": ("inventory__stock", "inventory_id"),
+}
+
+
+@admin_login_required
+def inventory_forecast(request):
+    """Active SKUs with forecast demand, days of cover and reorder suggestions."""
+    search_query = request.GET.get("search", "")
+    sort = request.GET.get("sort", "cover")
+    if sort not in FORECAST_SORTS:
+        sort = "cover"
+
+    forecasts = StockForecast.objects.select_related("inventory__product").filter(
+        inventory__is_active=True
+    )
+    if search_query:
+        forecasts = forecasts.filter(inventory__product__name__icontains=search_query)
+    forecasts = forecasts.order_by(*FORECAST_SORTS[sort])
+
+    paginator = CachedCountPaginator(forecasts, 20)
+    page_obj = paginator.get_page(request.GET.get("page"))
+
+    context = {
+        "current_page": "inventory_forecast",
+        "title": "Stock Forecast",
+        "page_obj": page_obj,
+        "search_query": search_query,
+        "sort": sort,
+    }
+    return render(request, "aadmin/inventory-forecast.html", context)
+
+
+def _editor_updates(post):
+    """Updates for the rows edited in the bulk editor; unedited cells are skipped."""
+    updates, errors = [], []
+    rows = zip(
+        post.getlist("sku"),
+        post.getlist("price"),
+        post.getlist("stock"),
+        post.getlist("was_price"),
+        post.getlist("was_stock"),
+    )
+    for row, (sku, price, stock, was_price, was_stock) in enumerate(rows, start=1):
+        slug, _, size = sku.partition(":")
+        edited = {
+            field: value
+            for field, value, was in (("price", price, was_price), ("stock", stock, was_stock))
+            if value.strip() != was
+        }
+        if not edited:
+            continue
+        try:
+            values = inventory_update.parse_values(edited)
+            expected = {field: int(was_price if field == "price" else was_stock) for field in values}
+        except ValueError as exc:
+            errors.append((row, f"{slug} {size}: {exc}"))
+            continue
+        if values:
+            updates.append((row, slug, size, values, expected))
+    return updates, errors
+
+
+@admin_login_required
+def inventory_bulk_update(request):
+    """Spreadsheet-style price and stock editor, plus CSV upload of the same changes."""
+    search_query = request.GET.get("search", "")
+    report = errors = None
+
+    if request.method == "POST":
+        upload = request.FILES.get("csv_file")
+        try:
+            if upload:
+                updates, errors = inventory_update.read_update_csv(
+                    codecs.iterdecode(upload, "utf-8-sig")
+                )
+            else:
+                updates, errors = _editor_updates(request.POST)
+        except (UnicodeDecodeError, ValueError) as exc:
+            messages.error(request, str(exc))
+        else:
+            report = inventory_update.apply_inventory_updates(updates)
+            errors = sorted(errors + report.errors)
+
+    inventory = Inventory.objects.select_related("product").order_by("product__name", "size")
+    if search_query:
+        inventory = inventory.filter(product__name__icontains=search_query)
+    paginator = CachedCountPaginator(inventory, 50)
+    page_obj = paginator.get_page(request.GET.get("page"))
+
+    context = {
+        "current_page": "inventory_list",
+        "title": "Bulk Inventory Update",
+        "page_obj": page_obj,
+        "search_query": search_query,
+        "report": report,
+        "errors": errors,
+    }
+    return render(request, "aadmin/inventory-bulk-update.html", context)
+
+
 @admin_login_required
 def add_edit_inventory(request, inventory_id=None):
 
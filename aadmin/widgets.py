@@ -0,0 +1,190 @@
+"""
+Admin dashboard widgets, computed on demand and cached independently.
+
+Each widget is a function returning JSON-serialisable data, registered with
+a TTL and the tags of the data it reads. ``get_widget()`` serves it from the
+cache under a key that includes the current generation of each tag, so
+``invalidate_widgets(tag)`` makes every dependent widget recompute on its
+next request without knowing their keys. A short lock keeps concurrent
+dashboard loads from computing the same expired widget at once.
+"""
+import time
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth
+
+from customer.models import DailySales, OrderItem
+from product.models import Category, Product, ProductImage
+
+KEY_PREFIX = "dashboard:"
+LOCK_SECONDS = 30
+LOCK_WAIT = 5
+
+WIDGETS = {}
+
+
+def widget(name, ttl, tags=()):
+    def register(func):
+        WIDGETS[name] = (func, ttl, tuple(tags))
+        return func
+
+    return register
+
+
+def _generations(tags):
+    keys = [f"{KEY_PREFIX}gen:{tag}" for tag in tags]
+    found = cache.get_many(keys)
+    return ".".join(str(found.get(key, 0)) for key in keys)
+
+
+def get_widget(name):
+    """Return the cached data for widget ``name``, computing it if expired."""
+    func, ttl, tags = WIDGETS[name]
+    key = f"{KEY_PREFIX}widget:{name}:{_generations(tags)}"
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    lock = f"{key}:lock"
+    if not cache.add(lock, 1, LOCK_SECONDS):
+        # Someone else is computing it; wait briefly rather than duplicate the work.
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            data = cache.get(key)
+            if data is not None:
+                return data
+    try:
+        data = func()
+        cache.set(key, data, ttl)
+    finally:
+        cache.delete(lock)
+    return data
+
+
+def invalidate_widgets(*tags):
+    """Expire every widget that depends on any of ``tags``."""
+    for tag in tags:
+        key = f"{KEY_PREFIX}gen:{tag}"
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def invalidate_widgets_on_commit(*tags):
+    """``invalidate_widgets`` once the current transaction commits (now if none)."""
+    transaction.on_commit(lambda: invalidate_widgets(*tags))
+
+
+def _revenue_by_bucket(trunc, since):
+    """Net revenue since ``since`` from the DailySales rollup, keyed by TruncMonth/TruncDay date."""
+    rows = (
+        DailySales.objects.filter(date__gte=since)
+        .annotate(bucket=trunc("date"))
+        .values("bucket")
+        .annotate(total=Sum(F("gross") - F("discount")))
+    )
+    return {row["bucket"]: row["total"] or 0 for row in rows}
+
+
+@widget("top_products", ttl=600, tags=("catalog", "orders"))
+def top_products():
+    top_products_info = (
+        OrderItem.objects.filter(product__isnull=False)
+        .values("product__id")
+        .annotate(total_quantity=Coalesce(Sum("quantity"), 0))
+        .order_by("-total_quantity")[:5]
+    )
+    products_by_id = {
+        p.id: p
+        for p in Product.objects.filter(
+            id__in=[p["product__id"] for p in top_products_info]
+        ).prefetch_related(
+            Prefetch("product_images", queryset=ProductImage.objects.order_by("priority"))
+        )
+    }
+    products = []
+    for info in top_products_info:
+        product = products_by_id.get(info["product__id"])
+        if not product:
+            continue
+        images = product.product_images.all()
+        products.append({
+            "name": product.name,
+            "image": images[0].image.url if images else "",
+            "quantity": info["total_quantity"],
+        })
+    return {"products": products}
+
+
+@widget("top_categories", ttl=600, tags=("catalog", "orders"))
+def top_categories():
+    top_categories_info = (
+        Product.objects.filter(main_category__isnull=False)
+        .values("main_category__id")
+        .annotate(total_quantity=Coalesce(Sum("orderitem__quantity"), 0))
+        .order_by("-total_quantity")[:10]
+    )
+    categories_by_id = {
+        c.id: c
+        for c in Category.objects.filter(
+            id__in=[c["main_category__id"] for c in top_categories_info]
+        )
+    }
+    categories = []
+    for info in top_categories_info:
+        category = categories_by_id.get(info["main_category__id"])
+        if not category:
+            continue
+        categories.append({
+            "name": category.name,
+            "image": category.image.url if category.image else "",
+            "quantity": info["total_quantity"],
+        })
+    return {"categories": categories}
+
+
+@widget("revenue_year", ttl=900, tags=("sales",))
+def revenue_year():
+    today = date.today()
+    month_starts = []
+    month = (today - timedelta(days=365)).replace(day=1)
+    while month <= today:
+        month_starts.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    revenue_per_month = _revenue_by_bucket(TruncMonth, month_starts[0])
+    values = [revenue_per_month.get(m, 0) for m in month_starts]
+    return {
+        "labels": [m.strftime("%b") for m in month_starts],
+        "values": values,
+        "total": sum(values),
+    }
+
+
+@widget("revenue_month", ttl=300, tags=("sales",))
+def revenue_month():
+    today = date.today()
+    month_start = today.replace(day=1)
+    revenue_per_day = _revenue_by_bucket(TruncDay, month_start)
+    days = list(range(1, today.day + 1))
+    values = [revenue_per_day.get(month_start.replace(day=d), 0) for d in days]
+    return {"labels": days, "values": values, "total": sum(values)}
+
+
+@widget("order_status", ttl=60, tags=("orders",))
+def order_status():
+    counts = OrderItem.objects.aggregate(
+        total=Count("id"),
+        **{
+            status: Count("id", filter=Q(status=status))
+            for status in ("pending", "confirmed", "shipped", "delivered", "cancelled")
+        },
+    )
+    total = counts.pop("total")
+    return {"counts": counts, "total": total}
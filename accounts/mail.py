@@ -0,0 +1,156 @@
+"""
+Outbound email queue.
+
+Request handlers call ``queue_email`` and return straight away; the
+``send_queued_emails`` command leases due rows and sends them over one
+long-lived backend connection. Failed sends are retried with exponential
+backoff and marked ``failed`` after ``max_attempts``.
+
+``settings.EMAIL_OUTBOX_BACKEND`` picks the transport. ``SendGridBackend``
+is the production default; ``DjangoMailBackend`` sends through Django's
+``EMAIL_BACKEND`` (SMTP, file, console or locmem), which is handy for
+measuring throughput offline against a local SMTP sink or a directory.
+"""
+import logging
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+MAX_BACKOFF_SECONDS = 3600
+
+
+def queue_email(to_email, subject, body):
+    """Queue one plain-text email for the background sender."""
+    return OutboundEmail.objects.create(to_email=to_email, subject=subject, body=body)
+
+
+class SendGridBackend:
+    """Sends through the SendGrid v3 API with a single reused client."""
+
+    def __init__(self):
+        self.client = SendGridAPIClient(settings.SENDGRID_API_KEY)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, email):
+        self.client.send(
+            Mail(
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to_emails=email.to_email,
+                subject=email.subject,
+                plain_text_content=email.body,
+            )
+        )
+
+
+class DjangoMailBackend:
+    """Sends through ``settings.EMAIL_BACKEND`` over one open connection."""
+
+    def __init__(self):
+        self.connection = get_connection()
+
+    def open(self):
+        self.connection.open()
+
+    def close(self):
+        self.connection.close()
+
+    def send(self, email):
+        EmailMessage(
+            email.subject,
+            email.body,
+            settings.DEFAULT_FROM_EMAIL,
+            [email.to_email],
+            connection=self.connection,
+        ).send()
+
+
+@lru_cache(maxsize=1)
+def get_backend():
+    return import_string(settings.EMAIL_OUTBOX_BACKEND)()
+
+
+def _claim_batch(batch_size):
+    """Lease up to ``batch_size`` due emails so no other worker picks them up."""
+    now = timezone.now()
+    with transaction.atomic():
+        email_ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="queued", available_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not email_ids:
+            return []
+        OutboundEmail.objects.filter(id__in=email_ids).update(
+            available_at=now + timedelta(seconds=LEASE_SECONDS),
+            attempts=F("attempts") + 1,
+        )
+    return list(OutboundEmail.objects.filter(id__in=email_ids).order_by("id"))
+
+
+def _retry_later(email, exc, max_attempts):
+    """Record a failed attempt; back off, or give up after ``max_attempts``."""
+    fields = {"last_error": str(exc)[:2000]}
+    if email.attempts >= max_attempts:
+        fields["status"] = "failed"
+    else:
+        fields["available_at"] = timezone.now() + timedelta(
+            seconds=min(2 ** email.attempts * 10, MAX_BACKOFF_SECONDS)
+        )
+    OutboundEmail.objects.filter(id=email.id).update(**fields)
+
+
+def send_queued_emails(batch_size=100, max_attempts=5):
+    """Send one batch of due emails; returns (sent, failed) counts."""
+    emails = _claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    backend = get_backend()
+    try:
+        backend.open()
+    except Exception as exc:
+        # Transport unreachable: release the lease with backoff, keep the worker alive.
+        logger.exception("Email backend could not be opened")
+        for email in emails:
+            _retry_later(email, exc, max_attempts)
+        return 0, len(emails)
+
+    sent_ids = []
+    failed = 0
+    try:
+        for email in emails:
+            try:
+                backend.send(email)
+            except Exception as exc:
+                failed += 1
+                logger.exception("Email %s failed (attempt %s)", email.id, email.attempts)
+                _retry_later(email, exc, max_attempts)
+            else:
+                sent_ids.append(email.id)
+    finally:
+        backend.close()
+
+    if sent_ids:
+        OutboundEmail.objects.filter(id__in=sent_ids).update(
+            status="sent", sent_at=timezone.now(), last_error=""
+        )
+    return len(sent_ids), failed
@@ -0,0 +1,44 @@
+"""
+Drain the outbound email queue.
+
+Run with ``--loop`` as a long-lived worker; OTP emails expire after 60
+seconds, so a cron schedule is too slow for them. See accounts/mail.py.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.mail import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Send queued emails through the configured backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling instead of exiting once the queue is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="Seconds to sleep between polls when idle (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_emails(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+                continue
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-19 16:20
+
+from django.db import migrations
+
+
+def mark_customer_accounts(apps, schema_editor):
+    """Every account with a customer row must have is_customer set before the
+    Customer proxy starts filtering on it."""
+    Account = apps.get_model("accounts", "Account")
+    Customer = apps.get_model("accounts", "Customer")
+    Account.objects.filter(
+        id__in=Customer.objects.values("account_ptr_id"), is_customer=False
+    ).update(is_customer=True)
+
+
+class Migration(migrations.Migration):
+    """
+    Step 1 of moving Customer from multi-table inheritance to a proxy:
+
+    1. accounts 0004: set is_customer on every account with a customer row.
+    2. customer 0009, aadmin 0003, payment 0003: repoint the customer FKs
+       at accounts_account (ids are unchanged, customer pk == account pk).
+    3. accounts 0005: drop accounts_customer and make Customer a proxy.
+    4. customer 0010, aadmin 0004, payment 0004: state-only, FKs back to
+       the Customer proxy.
+    """
+
+    dependencies = [
+        ('accounts', '0003_outbound_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_customer_accounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-19 16:20
+
+from django.db import migrations
+
+
+def restore_customer_rows(apps, schema_editor):
+    """Reverse only: refill accounts_customer from is_customer."""
+    Account = apps.get_model("accounts", "Account")
+    Customer = apps.get_model("accounts", "Customer")
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        f"INSERT INTO {quote(Customer._meta.db_table)} (account_ptr_id) "
+        f"SELECT id FROM {quote(Account._meta.db_table)} WHERE is_customer = %s",
+        [True],
+    )
+
+
+class Migration(migrations.Migration):
+    """Step 3 of the Customer proxy migration; see 0004_mark_customer_accounts."""
+
+    dependencies = [
+        ('accounts', '0004_mark_customer_accounts'),
+        ('aadmin', '0003_customer_fk_to_account'),
+        ('customer', '0009_customer_fk_to_account'),
+        ('payment', '0003_customer_fk_to_account'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, once the table exists again.
+        migrations.RunPython(migrations.RunPython.noop, restore_customer_rows),
+        migrations.DeleteModel(
+            name='Customer',
+        ),
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('accounts.account',),
+        ),
+    ]
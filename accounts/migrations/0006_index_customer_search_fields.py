@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-19 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_customer_proxy'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='first_name',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='account',
+            name='last_name',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='account',
+            name='mobile',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.utils import timezone
 
 
 class AccountManager(BaseUserManager):
@@ -33,10 +34,10 @@ class AccountManager(BaseUserManager):
 
 
 class Account(AbstractBaseUser):
-    first_name = models.CharField(max_length=50)
-    last_name = models.CharField(max_length=50)
+    first_name = models.CharField(max_length=50, db_index=True)
+    last_name = models.CharField(max_length=50, db_index=True)
     email = models.EmailField(max_length=254, unique=True)
-    mobile = models.CharField(max_length=10, null=True, blank=True)
+    mobile = models.CharField(max_length=10, null=True, blank=True, db_index=True)
     profile_image = models.ImageField(
         upload_to="images/user/customer/profile_image", null=True
     )
@@ -64,6 +65,54 @@ class Account(AbstractBaseUser):
 
 
 
+class CustomerManager(AccountManager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_customer=True)
+
+    def create_user(self, first_name, last_name, email, password=None):
+        user = super().create_user(first_name, last_name, email, password)
+        user.is_customer = True
+        user.save(using=self.db, update_fields=["is_customer"])
+        return user
+
+
 class Customer(Account):
+    """
+    Accounts with ``is_customer`` set. A proxy, so customer queries and the
+    foreign keys pointing here use the accounts_account table directly.
+    """
+
+    objects = CustomerManager()
+
+    class Meta:
+        proxy = True
+
+    def __str__(self):
+        return self.email
+
+class OutboundEmail(models.Model):
+    """Queued email, sent in batches by ``manage.py send_queued_emails``."""
+
+    STATUS_CHOICES = [
+        ("queued", "queued"),
+        ("sent", "sent"),
+        ("failed", "failed"),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return f"{self.subject} -> {self.to_email} ({self.status})"
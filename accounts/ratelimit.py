@@ -0,0 +1,91 @@
+"""
+Cache-backed sliding-window rate limiting for the account views.
+
+Each limit keeps two fixed-window counters in the cache and estimates the
+sliding-window count as ``current + previous * (1 - elapsed fraction)``,
+which needs one ``incr`` per request and no per-hit storage. Use a cache
+shared by all workers (``REDIS_URL``) in production; the default local
+memory cache only limits per process.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+
+def client_ip(request):
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _request_email(request):
+    email = request.POST.get("email") or request.session.get("email") or ""
+    return email.strip().lower()
+
+
+KEY_FUNCTIONS = {
+    "ip": client_ip,
+    "email": _request_email,
+}
+
+
+def hit(scope, identity, limit, window):
+    """
+    Count one request for ``identity`` under ``scope``.
+
+    Returns 0 if it is allowed, otherwise the seconds until it would be.
+    """
+    now = time.time()
+    index, elapsed = divmod(now, window)
+    base = f"rl:{scope}:{identity}"
+    current_key = f"{base}:{int(index)}"
+
+    cache.add(current_key, 0, timeout=window * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:  # evicted between add and incr
+        cache.set(current_key, 1, timeout=window * 2)
+        current = 1
+    previous = cache.get(f"{base}:{int(index) - 1}", 0)
+
+    estimate = current + previous * (1 - elapsed / window)
+    if estimate <= limit:
+        return 0
+    return int(window - elapsed) + 1
+
+
+def rate_limit(scope, limit, window, key="ip", methods=("POST",)):
+    """
+    Reject with 429 once ``key`` ("ip" or "email") exceeds ``limit`` requests
+    per ``window`` seconds. Only ``methods`` are counted; None counts all.
+    """
+    key_func = KEY_FUNCTIONS[key]
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if settings.RATE_LIMIT_ENABLED and (
+                methods is None or request.method in methods
+            ):
+                identity = key_func(request)
+                retry_after = identity and hit(
+                    f"{scope}:{key}", identity, limit, window
+                )
+                if retry_after:
+                    response = HttpResponse(
+                        "Too many attempts. Please try again later.",
+                        status=429,
+                        content_type="text/plain",
+                    )
+                    response["Retry-After"] = str(retry_after)
+                    return response
+            return view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
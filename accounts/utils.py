@@ -1,8 +1,6 @@
 import pyotp
 from datetime import datetime, timedelta
-from django.conf import settings
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from .mail import queue_email
 from .models import Account
 
 
@@ -23,11 +21,10 @@ def send_otp(request):
         "otp_valid_till": valid_till.isoformat(),
     })
 
-    message = Mail(
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to_emails=email,
-        subject="OTP Verification - Amart Fashions",
-        plain_text_content=f"""
+    queue_email(
+        email,
+        "OTP Verification - Amart Fashions",
+        f"""
     Dear Customer,
 
     Thank you for choosing Amart Fashions.
@@ -43,10 +40,6 @@ def send_otp(request):
     Warm regards,  
     Amart Fashions Team  
     Secure • Trusted • Fashion Forward
-    """
+    """,
     )
-
-
-    sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
-    sg.send(message)
     return True
@@ -11,6 +11,7 @@ from django.core.validators import validate_email
 from django.shortcuts import redirect, render
 
 from .models import Account, Customer
+from .ratelimit import rate_limit
 from .utils import send_otp
 
 
@@ -19,6 +20,7 @@ def _normalize_email(email: str) -> str:
     return (email or "").strip().lower()
 
 
+@rate_limit("signup", 10, 3600)
 def customer_signup(request):
     """Customer registration: validate inputs then start OTP flow."""
     if request.method == "POST":
@@ -81,6 +83,8 @@ def customer_signup(request):
 
 
 
+@rate_limit("customer_login", 20, 300)
+@rate_limit("customer_login", 5, 300, key="email")
 def customer_login(request):
     """Customer login with basic account checks."""
     if request.method == "POST":
@@ -128,6 +132,8 @@ def customer_logout(request):
 
 
 
+@rate_limit("admin_login", 10, 300)
+@rate_limit("admin_login", 5, 300, key="email")
 def admin_login(request):
     """Admin login restricted to superadmin accounts."""
     if request.method == "POST":
@@ -181,6 +187,8 @@ def admin_logout(request):
 
 
 
+@rate_limit("otp_send", 10, 3600, methods=None)
+@rate_limit("otp_send", 5, 3600, key="email", methods=None)
 def otp_view(request):
     """Send OTP and redirect to activation page."""
     if not request.session.get("email"):
@@ -251,6 +259,8 @@ def customer_activation(request):
 
 
 
+@rate_limit("otp_send", 10, 3600, methods=None)
+@rate_limit("otp_send", 5, 3600, key="email", methods=None)
 def resend_otp(request):
     """Resend OTP with basic rate limiting and expiry checks."""
     email = request.session.get("email")
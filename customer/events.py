@@ -0,0 +1,190 @@
+"""
+Order event outbox: recording and dispatch.
+
+Views call ``record_order_event`` inside the transaction that changes the
+order, so an event exists if and only if the change was committed. Recording
+an event also expires the order and sales dashboard widgets on commit.
+``dispatch_pending_events`` (run by the ``dispatch_order_events`` command)
+leases a batch, runs every handler in ``settings.ORDER_EVENT_HANDLERS`` and
+marks the batch delivered. Each event remembers which handlers succeeded, so
+a retry after one handler fails runs only the handlers that have not yet
+succeeded. A worker that dies mid-batch simply lets the lease expire and the
+events are delivered again, so handlers should still be idempotent; the
+event id in the payload can be used as the idempotency key.
+"""
+import json
+import logging
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from aadmin.widgets import invalidate_widgets_on_commit
+from accounts.mail import queue_email
+
+from .models import OrderEvent
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+MAX_BACKOFF_SECONDS = 3600
+
+
+def record_order_event(order, event_type, **payload):
+    """Queue one event for ``order``; call inside the order's transaction."""
+    invalidate_widgets_on_commit("orders", "sales")
+    return OrderEvent.objects.create(
+        order=order,
+        event_type=event_type,
+        payload=_base_payload(order) | payload,
+    )
+
+
+def record_order_events(events):
+    """Queue several ``(order, event_type, payload)`` events with one INSERT."""
+    invalidate_widgets_on_commit("orders", "sales")
+    OrderEvent.objects.bulk_create(
+        [
+            OrderEvent(
+                order=order,
+                event_type=event_type,
+                payload=_base_payload(order) | payload,
+            )
+            for order, event_type, payload in events
+        ],
+        batch_size=500,
+    )
+
+
+def _base_payload(order):
+    return {
+        "order_id": order.id,
+        "customer_id": order.customer_id,
+        "status": order.status,
+        "total_amount": order.total_amount,
+        "payment_method": order.payment_method,
+        "is_paid": order.is_paid,
+    }
+
+
+def _claim_batch(batch_size):
+    """Lease up to ``batch_size`` due events so no other worker picks them up."""
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            OrderEvent.objects.select_for_update(skip_locked=True)
+            .filter(dispatched_at__isnull=True, available_at__lte=now)
+            .order_by("id")[:batch_size]
+        )
+        if not events:
+            return []
+        event_ids = [event.id for event in events]
+        OrderEvent.objects.filter(id__in=event_ids).update(
+            available_at=now + timedelta(seconds=LEASE_SECONDS),
+            attempts=F("attempts") + 1,
+        )
+    return list(
+        OrderEvent.objects.filter(id__in=event_ids)
+        .select_related("order__customer")
+        .order_by("id")
+    )
+
+
+def dispatch_pending_events(batch_size=100, max_attempts=10):
+    """Deliver one batch of due events; returns (delivered, failed) counts."""
+    handlers = [(path, import_string(path)) for path in settings.ORDER_EVENT_HANDLERS]
+    events = _claim_batch(batch_size)
+
+    delivered_ids = []
+    failed = 0
+    for event in events:
+        done = list(event.delivered_handlers)
+        try:
+            for path, handler in handlers:
+                if path in done:
+                    continue
+                handler(event)
+                done.append(path)
+        except Exception as exc:
+            failed += 1
+            attempts = event.attempts
+            logger.exception("Order event %s failed (attempt %s)", event.id, attempts)
+            if attempts >= max_attempts:
+                # Park it: keep the row for inspection but stop retrying.
+                retry_at = timezone.now() + timedelta(days=3650)
+            else:
+                retry_at = timezone.now() + timedelta(
+                    seconds=min(2 ** attempts * 10, MAX_BACKOFF_SECONDS)
+                )
+            OrderEvent.objects.filter(id=event.id).update(
+                available_at=retry_at, last_error=str(exc)[:2000], delivered_handlers=done
+            )
+        else:
+            delivered_ids.append(event.id)
+
+    if delivered_ids:
+        OrderEvent.objects.filter(id__in=delivered_ids).update(
+            dispatched_at=timezone.now(), last_error=""
+        )
+    return len(delivered_ids), failed
+
+
+def log_event(event):
+    """Handler: write the event to the application log."""
+    logger.info("Order event %s %s %s", event.id, event.event_type, event.payload)
+
+
+EMAIL_SUBJECTS = {
+    "order.created": "Your Amart order #{order_id} has been placed",
+    "order.cancelled": "Your Amart order #{order_id} has been cancelled",
+    "order.returned": "Your Amart order #{order_id} has been returned",
+    "order_item.cancelled": "An item in your Amart order #{order_id} was cancelled",
+    "order_item.status_changed": "Your Amart order #{order_id} is now {new_status}",
+}
+
+
+def email_customer(event):
+    """Handler: queue an email to the customer about the order change."""
+    subject = EMAIL_SUBJECTS[event.event_type].format(**event.payload)
+    queue_email(
+        event.order.customer.email,
+        subject,
+        f"""
+    Dear {event.order.customer.first_name},
+
+    {subject}.
+
+    Order total: ₹{event.payload["total_amount"]}
+    Payment method: {event.payload["payment_method"]}
+
+    Warm regards,
+    Amart Fashions Team
+    """,
+    )
+
+
+def post_to_webhooks(event):
+    """Handler: POST the event as JSON to each of ``settings.ORDER_EVENT_WEBHOOK_URLS``."""
+    body = json.dumps(
+        {
+            "id": event.id,
+            "type": event.event_type,
+            "created_at": event.created_at.isoformat(),
+            "data": event.payload,
+        }
+    )
+    for url in settings.ORDER_EVENT_WEBHOOK_URLS:
+        response = requests.post(
+            url,
+            data=body,
+            headers={
+                "Content-Type": "application/json",
+                "Idempotency-Key": f"order-event-{event.id}",
+            },
+            timeout=5,
+        )
+        response.raise_for_status()
@@ -0,0 +1,69 @@
+"""
+Server-side invoice PDFs with an on-disk cache.
+
+A rendered invoice is stored under ``settings.INVOICE_ROOT`` with the order id
+and ``Order.updated_at`` in its file name, so any change to the order yields a
+new file and repeat downloads are served straight from disk. The folder is
+not under MEDIA_ROOT; invoices are only served by the ``invoice_pdf`` view,
+which checks that the order belongs to the customer.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from xhtml2pdf import pisa
+
+from .models import OrderItem
+
+INVOICE_DIR = Path(settings.INVOICE_ROOT)
+
+
+def invoice_version(order):
+    """Version tag that changes whenever the order row is saved."""
+    return f"{order.id}-{int(order.updated_at.timestamp() * 1_000_000)}"
+
+
+def invoice_path(order):
+    return INVOICE_DIR / f"invoice-{invoice_version(order)}.pdf"
+
+
+def _render_invoice_pdf(order, destination):
+    order_items = list(
+        OrderItem.objects.filter(order=order).select_related("product", "inventory")
+    )
+    sub_total = sum(oi.quantity * oi.inventory.price for oi in order_items)
+    html = render_to_string(
+        "customer/invoice-pdf.html",
+        {"order": order, "order_items": order_items, "sub_total": sub_total},
+    )
+
+    # Write to a temp file first so concurrent readers never see a partial PDF.
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            result = pisa.CreatePDF(html, dest=tmp_file, encoding="utf-8")
+        if result.err:
+            raise RuntimeError(f"Could not render invoice for order {order.id}")
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def get_invoice_pdf(order):
+    """Return the path of the order's invoice PDF, rendering it on a cache miss."""
+    path = invoice_path(order)
+    if path.exists():
+        return path
+
+    INVOICE_DIR.mkdir(parents=True, exist_ok=True)
+    _render_invoice_pdf(order, path)
+
+    # Drop invoices rendered for earlier versions of this order.
+    for stale in INVOICE_DIR.glob(f"invoice-{order.id}-*.pdf"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,44 @@
+"""
+Drain the OrderEvent outbox.
+
+Run once (e.g. from cron every minute) or with ``--loop`` as a long-lived
+worker process. Delivery is at least once; see customer/events.py.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from customer.events import dispatch_pending_events
+
+
+class Command(BaseCommand):
+    help = "Deliver pending order events to the configured handlers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--max-attempts", type=int, default=10)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling instead of exiting once the outbox is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep between polls when idle (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            delivered, failed = dispatch_pending_events(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            if delivered or failed:
+                self.stdout.write(f"Delivered {delivered}, failed {failed}.")
+                continue
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,12 @@
+"""Backfill or repair CustomerStats from the order tables."""
+from django.core.management.base import BaseCommand
+
+from customer.sales import rebuild_customer_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute every customer's order count, lifetime value and last order."
+
+    def handle(self, *args, **options):
+        rows = rebuild_customer_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {rows} customer(s)."))
@@ -0,0 +1,65 @@
+"""
+Backfill or repair the DailySales rollup from the order tables.
+
+The range is split into chunks of ``--chunk-days`` that are rebuilt
+concurrently by ``--workers`` threads, each in its own transaction, or by
+one worker on SQLite, which allows only one writer at a time. While a
+chunk is rebuilt, order changes on its days wait for it (see
+customer/sales.py), so shorter chunks keep those waits short.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Min
+from django.utils import timezone
+
+from aadmin.widgets import invalidate_widgets
+from customer.models import Order
+from customer.sales import rebuild_daily_sales
+
+
+def _rebuild_chunk(start, end):
+    try:
+        return start, end, rebuild_daily_sales(start, end)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Rebuild DailySales for a date range from orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, help="YYYY-MM-DD; default first order")
+        parser.add_argument("--end", type=date.fromisoformat, help="YYYY-MM-DD; default today")
+        parser.add_argument("--chunk-days", type=int, default=31)
+        parser.add_argument("--workers", type=int, default=4)
+
+    def handle(self, *args, **options):
+        end = options["end"] or timezone.localdate()
+        start = options["start"]
+        if start is None:
+            first = Order.objects.aggregate(first=Min("created_at"))["first"]
+            if first is None:
+                self.stdout.write("No orders.")
+                return
+            start = timezone.localdate(first)
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+
+        chunks = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=options["chunk_days"] - 1), end)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+        workers = 1 if connection.vendor == "sqlite" else options["workers"]
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk_start, chunk_end, rows in pool.map(lambda c: _rebuild_chunk(*c), chunks):
+                total += rows
+                self.stdout.write(f"{chunk_start} .. {chunk_end}: {rows} row(s)")
+        invalidate_widgets("sales")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(chunks)} chunk(s), {total} row(s)."))
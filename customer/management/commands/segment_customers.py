@@ -0,0 +1,54 @@
+"""
+Score customers by recency, frequency and monetary value and store their
+segment; optionally issue a single-use coupon to everyone in one segment.
+Run ``rebuild_customer_stats`` first if CustomerStats needs a backfill.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from customer.segments import SEGMENTS, issue_segment_coupons, segment_customers
+
+
+class Command(BaseCommand):
+    help = "Assign RFM segments to customers and optionally issue coupons per segment."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Print segment sizes only.")
+        parser.add_argument(
+            "--issue-coupons",
+            metavar="SEGMENT",
+            choices=[label for label, _ in SEGMENTS] + ["other"],
+            help="Give every customer in SEGMENT a single-use coupon.",
+        )
+        parser.add_argument("--discount", type=int, help="Coupon discount amount (₹).")
+        parser.add_argument("--minimum-purchase", type=int, default=0)
+        parser.add_argument("--prefix", default="RFM", help="Coupon code prefix, up to 9 characters.")
+
+    def handle(self, *args, **options):
+        segment = options["issue_coupons"]
+        prefix = options["prefix"].upper()
+        if segment:
+            if options["dry_run"]:
+                raise CommandError("--issue-coupons cannot be combined with --dry-run.")
+            if not options["discount"] or options["discount"] < 1:
+                raise CommandError("--issue-coupons needs a positive --discount.")
+            if not prefix.isalnum() or len(prefix) > 9:
+                raise CommandError("--prefix must be 1-9 letters or digits.")
+
+        started = time.monotonic()
+        counts = segment_customers(dry_run=options["dry_run"])
+        for label, count in counts.most_common():
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scored {sum(counts.values())} customer(s) in {time.monotonic() - started:.1f}s"
+                + (" (dry run)." if options["dry_run"] else ".")
+            )
+        )
+
+        if segment:
+            issued = issue_segment_coupons(
+                segment, options["discount"], options["minimum_purchase"], prefix
+            )
+            self.stdout.write(self.style.SUCCESS(f"Issued {issued} {prefix} coupon(s) to {segment}."))
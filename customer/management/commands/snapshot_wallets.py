@@ -0,0 +1,145 @@
+"""
+Periodic wallet ledger snapshot and compaction.
+
+Folds every WalletTransaction written since a wallet's last snapshot into a new
+WalletSnapshot, reports wallets whose ``Wallet.balance`` no longer matches the
+ledger, and prunes all but the newest ``--keep`` snapshots per wallet.
+Meant to be run from cron, e.g. nightly.
+
+Only transactions older than ``--lag-minutes`` are folded, and the watermark
+is the highest id among them. Ids are allocated before commit, so a row with
+a lower id than the newest one may still become visible later; waiting out
+the lag keeps such rows from falling behind the watermark for good.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from customer.models import Wallet, WalletSnapshot, WalletTransaction
+
+
+class Command(BaseCommand):
+    help = "Snapshot wallet balances from the ledger and prune old snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=3,
+            help="Number of snapshots to keep per wallet (default: 3).",
+        )
+        parser.add_argument(
+            "--lag-minutes",
+            type=int,
+            default=10,
+            help="Leave transactions newer than this for the next run (default: 10).",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options["lag_minutes"])
+        watermark = WalletTransaction.objects.filter(created_at__lte=cutoff).aggregate(
+            last=Max("id")
+        )["last"]
+        if watermark is None:
+            self.stdout.write("No settled wallet transactions yet.")
+            return
+
+        latest_ids = (
+            WalletSnapshot.objects.values("wallet_id")
+            .annotate(latest=Max("id"))
+            .values_list("latest", flat=True)
+        )
+        latest = {
+            snapshot.wallet_id: snapshot
+            for snapshot in WalletSnapshot.objects.filter(id__in=list(latest_ids))
+        }
+
+        # Wallets sharing a watermark (normally all of them, since every run
+        # uses one) are folded forward with a single grouped aggregate.
+        wallets_by_watermark = defaultdict(list)
+        for wallet_id in WalletTransaction.objects.values_list(
+            "wallet_id", flat=True
+        ).distinct():
+            snapshot = latest.get(wallet_id)
+            wallets_by_watermark[snapshot.last_transaction_id if snapshot else 0].append(
+                wallet_id
+            )
+
+        balances = {}
+        for since, wallet_ids in wallets_by_watermark.items():
+            if since >= watermark:
+                continue
+            rows = (
+                WalletTransaction.objects.filter(
+                    wallet_id__in=wallet_ids, id__gt=since, id__lte=watermark
+                )
+                .values("wallet_id", "transaction_type")
+                .annotate(total=Sum("amount"))
+            )
+            for row in rows:
+                wallet_id = row["wallet_id"]
+                if wallet_id not in balances:
+                    snapshot = latest.get(wallet_id)
+                    balances[wallet_id] = snapshot.balance if snapshot else 0
+                if row["transaction_type"] == "credit":
+                    balances[wallet_id] += row["total"]
+                else:
+                    balances[wallet_id] -= row["total"]
+
+        with transaction.atomic():
+            WalletSnapshot.objects.bulk_create(
+                [
+                    WalletSnapshot(
+                        wallet_id=wallet_id,
+                        balance=balance,
+                        last_transaction_id=watermark,
+                    )
+                    for wallet_id, balance in balances.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(f"Wrote {len(balances)} wallet snapshot(s).")
+
+        expected = {wallet_id: snapshot.balance for wallet_id, snapshot in latest.items()}
+        expected.update(balances)
+        self._report_drift(expected, watermark)
+        self._compact(options["keep"])
+
+    def _report_drift(self, expected, watermark):
+        """Warn about wallets whose stored balance disagrees with the ledger."""
+        still_moving = set(
+            WalletTransaction.objects.filter(id__gt=watermark).values_list(
+                "wallet_id", flat=True
+            )
+        )
+        for wallet_id, balance in Wallet.objects.filter(
+            id__in=list(expected)
+        ).values_list("id", "balance"):
+            if wallet_id in still_moving:
+                continue
+            if balance != expected[wallet_id]:
+                self.stderr.write(
+                    f"Wallet {wallet_id}: balance ₹{balance} but ledger says "
+                    f"₹{expected[wallet_id]}."
+                )
+
+    def _compact(self, keep):
+        """Delete all but the newest ``keep`` snapshots of every wallet."""
+        stale_ids = []
+        seen = defaultdict(int)
+        for snapshot_id, wallet_id in (
+            WalletSnapshot.objects.order_by("wallet_id", "-id")
+            .values_list("id", "wallet_id")
+            .iterator(chunk_size=2000)
+        ):
+            seen[wallet_id] += 1
+            if seen[wallet_id] > keep:
+                stale_ids.append(snapshot_id)
+
+        for start in range(0, len(stale_ids), 1000):
+            WalletSnapshot.objects.filter(id__in=stale_ids[start:start + 1000]).delete()
+        self.stdout.write(f"Pruned {len(stale_ids)} old snapshot(s).")
@@ -0,0 +1,66 @@
+# Generated by Django 5.1 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    """Seed the ledger so existing balances have a matching history entry."""
+    Wallet = apps.get_model("customer", "Wallet")
+    WalletTransaction = apps.get_model("customer", "WalletTransaction")
+    WalletTransaction.objects.bulk_create(
+        [
+            WalletTransaction(
+                wallet_id=wallet.id,
+                customer_id=wallet.customer_id,
+                transaction_type="credit",
+                amount=wallet.balance,
+                reason="opening",
+            )
+            for wallet in Wallet.objects.filter(balance__gt=0).iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_remove_customer_approved'),
+        ('customer', '0006_alter_address_mobile_alter_address_pincode_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.IntegerField()),
+                ('last_transaction_id', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='customer.wallet')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'get_latest_by': 'created_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='WalletTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_type', models.CharField(choices=[('credit', 'credit'), ('debit', 'debit')], max_length=6)),
+                ('amount', models.PositiveIntegerField()),
+                ('reason', models.CharField(choices=[('opening', 'opening'), ('topup', 'topup'), ('refund', 'refund'), ('payment', 'payment')], max_length=20)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer')),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='customer.wallet')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['customer', '-created_at'], name='customer_wa_custome_24f2a7_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Step 2 of the Customer proxy migration (see accounts 0005): point the
+    customer foreign keys at accounts_account. Customer ids equal account
+    ids, so the stored values are unchanged.
+    """
+
+    dependencies = [
+        ('accounts', '0004_mark_customer_accounts'),
+        ('customer', '0008_order_event_outbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='address',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.account'),
+        ),
+        migrations.AlterField(
+            model_name='cart',
+            name='customer',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='accounts.account'),
+        ),
+        migrations.AlterField(
+            model_name='favouriteitem',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.account'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.account'),
+        ),
+        migrations.AlterField(
+            model_name='wallet',
+            name='customer',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='accounts.account'),
+        ),
+        migrations.AlterField(
+            model_name='wallettransaction',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.account'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Step 4 of the Customer proxy migration: point the foreign keys back at
+    Customer, which is now a proxy on the same table, so this is state-only.
+    """
+
+    dependencies = [
+        ('accounts', '0005_customer_proxy'),
+        ('customer', '0009_customer_fk_to_account'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='address',
+                    name='customer',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer'),
+                ),
+                migrations.AlterField(
+                    model_name='cart',
+                    name='customer',
+                    field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer'),
+                ),
+                migrations.AlterField(
+                    model_name='favouriteitem',
+                    name='customer',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer'),
+                ),
+                migrations.AlterField(
+                    model_name='order',
+                    name='customer',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer'),
+                ),
+                migrations.AlterField(
+                    model_name='wallet',
+                    name='customer',
+                    field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer'),
+                ),
+                migrations.AlterField(
+                    model_name='wallettransaction',
+                    name='customer',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer'),
+                ),
+            ],
+        ),
+    ]
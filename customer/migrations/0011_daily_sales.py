@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-19 16:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0010_customer_fk_to_proxy'),
+        ('product', '0009_alter_product_main_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units', models.IntegerField(default=0)),
+                ('gross', models.IntegerField(default=0)),
+                ('discount', models.IntegerField(default=0)),
+                ('order_count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='product.category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='product.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'category'], name='customer_da_date_b10303_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='unique_daily_sales')],
+            },
+        ),
+    ]
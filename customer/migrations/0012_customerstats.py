@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-19 16:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_index_customer_search_fields'),
+        ('customer', '0011_daily_sales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerStats',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='accounts.customer')),
+                ('order_count', models.IntegerField(db_index=True, default=0)),
+                ('lifetime_value', models.IntegerField(db_index=True, default=0)),
+                ('last_order_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-19 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0012_customerstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerstats',
+            name='rfm_score',
+            field=models.CharField(blank=True, max_length=3),
+        ),
+        migrations.AddField(
+            model_name='customerstats',
+            name='segment',
+            field=models.CharField(blank=True, db_index=True, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='customerstats',
+            name='segmented_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
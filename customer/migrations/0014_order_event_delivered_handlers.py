@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-19 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0013_customerstats_segment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderevent',
+            name='delivered_handlers',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
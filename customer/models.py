@@ -1,5 +1,6 @@
 from django.db import models
-from product.models import Product, Inventory
+from django.utils import timezone
+from product.models import Category, Product, Inventory
 from accounts.models import Customer
 from aadmin.models import Coupon
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
@@ -98,6 +99,16 @@ class OrderItem(models.Model):
         ("delivered", "delivered"),
         ("cancelled", "cancelled"),
     ]
+
+    # Status changes an admin may apply; anything else is rejected.
+    ALLOWED_TRANSITIONS = {
+        "pending": {"confirmed", "cancelled"},
+        "confirmed": {"shipped", "cancelled"},
+        "shipped": {"delivered"},
+        "delivered": set(),
+        "cancelled": set(),
+    }
+
     order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, default=1)
@@ -109,6 +120,15 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.quantity} x{self.product.name}"
 
+    @classmethod
+    def statuses_allowing(cls, new_status):
+        """Return the statuses an item may move to ``new_status`` from."""
+        return [
+            status
+            for status, targets in cls.ALLOWED_TRANSITIONS.items()
+            if new_status in targets
+        ]
+
 
 
 
@@ -126,3 +146,139 @@ class FavouriteItem(models.Model):
 class Wallet(models.Model):
     customer = models.OneToOneField(Customer, on_delete=models.CASCADE)
     balance = models.PositiveIntegerField(default=0)
+
+
+class WalletTransaction(models.Model):
+    """Append-only ledger entry; every change to ``Wallet.balance`` writes one."""
+
+    TYPE_CHOICES = [
+        ("credit", "credit"),
+        ("debit", "debit"),
+    ]
+    REASON_CHOICES = [
+        ("opening", "opening"),
+        ("topup", "topup"),
+        ("refund", "refund"),
+        ("payment", "payment"),
+    ]
+
+    wallet = models.ForeignKey(Wallet, related_name="transactions", on_delete=models.CASCADE)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    transaction_type = models.CharField(max_length=6, choices=TYPE_CHOICES)
+    amount = models.PositiveIntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["customer", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_type} ₹{self.amount} ({self.reason})"
+
+
+class WalletSnapshot(models.Model):
+    """Wallet balance up to ``last_transaction_id``, written by ``snapshot_wallets``."""
+
+    wallet = models.ForeignKey(Wallet, related_name="snapshots", on_delete=models.CASCADE)
+    balance = models.IntegerField()
+    last_transaction_id = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        get_latest_by = "created_at"
+
+
+class OrderEvent(models.Model):
+    """
+    Transactional outbox row for an order side effect (email, webhook, ...).
+
+    Written in the same transaction as the order change and delivered later,
+    at least once, by the ``dispatch_order_events`` command.
+    """
+
+    EVENT_CHOICES = [
+        ("order.created", "order.created"),
+        ("order.cancelled", "order.cancelled"),
+        ("order.returned", "order.returned"),
+        ("order_item.cancelled", "order_item.cancelled"),
+        ("order_item.status_changed", "order_item.status_changed"),
+    ]
+
+    order = models.ForeignKey(Order, related_name="events", on_delete=models.CASCADE)
+    event_type = models.CharField(max_length=40, choices=EVENT_CHOICES)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Dotted paths of the handlers that have already succeeded for this event.
+    delivered_handlers = models.JSONField(default=list, blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["dispatched_at", "available_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} for order {self.order_id}"
+
+
+class DailySales(models.Model):
+    """
+    Per-day, per-product sales rollup maintained by customer/sales.py.
+
+    Counts items that are not cancelled or returned, on the local date the
+    order was placed. ``discount`` is the product's share of the order's
+    coupon discount; ``order_count`` is the number of orders containing it.
+    """
+
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, null=True, on_delete=models.SET_NULL)
+    units = models.IntegerField(default=0)
+    gross = models.IntegerField(default=0)
+    discount = models.IntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "product"], name="unique_daily_sales"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "category"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.product_id}: {self.units} units"
+
+
+class CustomerStats(models.Model):
+    """
+    Lifetime order metrics per customer, maintained by customer/sales.py
+    alongside DailySales so the admin customer list can sort on them.
+
+    ``order_count`` and ``lifetime_value`` (net of coupon discounts) count
+    items that are not cancelled or returned; ``last_order_at`` is when the
+    customer last placed an order. ``rfm_score`` and ``segment`` are written
+    by the ``segment_customers`` command (customer/segments.py).
+    """
+
+    customer = models.OneToOneField(
+        Customer, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    order_count = models.IntegerField(default=0, db_index=True)
+    lifetime_value = models.IntegerField(default=0, db_index=True)
+    last_order_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    rfm_score = models.CharField(max_length=3, blank=True)
+    segment = models.CharField(max_length=30, blank=True, db_index=True)
+    segmented_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.order_count} orders, {self.lifetime_value}"
@@ -0,0 +1,255 @@
+"""
+DailySales rollup maintenance.
+
+Order creation calls ``record_order_sales`` and every cancellation or return
+calls ``reverse_order_sales`` in the same transaction, so the rollup moves
+with the orders. Both apply F() deltas to the affected (date, product) rows,
+so concurrent orders never overwrite each other. ``rebuild_daily_sales``
+recomputes a date range from the order tables; the ``rebuild_daily_sales``
+command uses it to backfill or repair history. A rebuild reads and rewrites
+its range in one transaction; on PostgreSQL it holds an exclusive advisory
+lock per day meanwhile, and the hooks take the same lock in shared mode, so
+no order change can land between the rebuild's read and its write.
+
+The same hooks keep each customer's CustomerStats (order count, lifetime
+value, last order) current; ``rebuild_customer_stats`` recomputes them
+the same way, holding the lock for every day that has orders.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from itertools import groupby
+
+from django.db import connection, transaction
+from django.db.models import F, Max, Min, Q
+from django.utils import timezone
+
+from .models import CustomerStats, DailySales, Order, OrderItem
+
+INACTIVE_STATUSES = ("cancelled", "returned")
+
+# First key of the (namespace, day) advisory locks that guard a day's rollup.
+LOCK_NAMESPACE = 7301
+
+_ITEM_FIELDS = (
+    "id",
+    "order_id",
+    "product_id",
+    "product__main_category_id",
+    "price",
+    "quantity",
+    "status",
+)
+
+
+def _discount_shares(discount, items):
+    """Split an order discount across its items in proportion to line totals."""
+    lines = {item["id"]: item["price"] * item["quantity"] for item in items}
+    total = sum(lines.values())
+    if not discount or not total:
+        return dict.fromkeys(lines, 0)
+    shares = {item_id: discount * line // total for item_id, line in lines.items()}
+    largest = max(lines, key=lines.get)
+    shares[largest] += discount - sum(shares.values())
+    return shares
+
+
+def _product_totals(discount, items, counted_ids):
+    """
+    Rollup contribution of the ``counted_ids`` items of one order, keyed by
+    product: ``[category_id, units, gross, discount]``. ``items`` must be all
+    of the order's items so the discount split does not depend on status.
+    """
+    shares = _discount_shares(discount, items)
+    totals = {}
+    for item in items:
+        if item["id"] not in counted_ids:
+            continue
+        row = totals.setdefault(
+            item["product_id"], [item["product__main_category_id"], 0, 0, 0]
+        )
+        row[1] += item["quantity"]
+        row[2] += item["price"] * item["quantity"]
+        row[3] += shares[item["id"]]
+    return totals
+
+
+def _lock_days(start, end=None, shared=False):
+    """
+    Hold the rollup lock for each day from ``start`` to ``end`` (inclusive)
+    until the transaction ends. PostgreSQL only; elsewhere a no-op.
+    """
+    if connection.vendor != "postgresql":
+        return
+    function = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {function}(%s::int, day) FROM generate_series(%s::int, %s::int) AS day",
+            [LOCK_NAMESPACE, start.toordinal(), (end or start).toordinal()],
+        )
+
+
+def _apply(day, totals, order_counts, sign):
+    DailySales.objects.bulk_create(
+        [
+            DailySales(date=day, product_id=product_id, category_id=row[0])
+            for product_id, row in totals.items()
+        ],
+        ignore_conflicts=True,
+    )
+    for product_id, (_, units, gross, discount) in totals.items():
+        DailySales.objects.filter(date=day, product_id=product_id).update(
+            units=F("units") + sign * units,
+            gross=F("gross") + sign * gross,
+            discount=F("discount") + sign * discount,
+            order_count=F("order_count") + sign * order_counts.get(product_id, 0),
+        )
+
+
+def _apply_customer(customer_id, orders, value, placed_at=None):
+    CustomerStats.objects.bulk_create(
+        [CustomerStats(customer_id=customer_id)], ignore_conflicts=True
+    )
+    stats = CustomerStats.objects.filter(customer_id=customer_id)
+    stats.update(
+        order_count=F("order_count") + orders,
+        lifetime_value=F("lifetime_value") + value,
+    )
+    if placed_at is not None:
+        stats.filter(
+            Q(last_order_at__isnull=True) | Q(last_order_at__lt=placed_at)
+        ).update(last_order_at=placed_at)
+
+
+def _net_value(totals):
+    return sum(gross - discount for _, _, gross, discount in totals.values())
+
+
+def _order_items(order):
+    return list(OrderItem.objects.filter(order=order).values(*_ITEM_FIELDS))
+
+
+def record_order_sales(order):
+    """Add a newly placed order to the rollup; call inside its transaction."""
+    items = _order_items(order)
+    totals = _product_totals(order.discount or 0, items, {item["id"] for item in items})
+    day = timezone.localdate(order.created_at)
+    with transaction.atomic():
+        _lock_days(day, shared=True)
+        _apply(day, totals, dict.fromkeys(totals, 1), 1)
+        _apply_customer(
+            order.customer_id, 1 if totals else 0, _net_value(totals), order.created_at
+        )
+
+
+def reverse_order_sales(order, order_item_ids):
+    """
+    Take items that were just cancelled or returned out of the rollup. Call
+    after their status has changed, inside the same transaction.
+    """
+    items = _order_items(order)
+    removed = set(order_item_ids)
+    totals = _product_totals(order.discount or 0, items, removed)
+    still_sold = {
+        item["product_id"]
+        for item in items
+        if item["id"] not in removed and item["status"] not in INACTIVE_STATUSES
+    }
+    day = timezone.localdate(order.created_at)
+    with transaction.atomic():
+        _lock_days(day, shared=True)
+        _apply(
+            day,
+            totals,
+            {product_id: 1 for product_id in totals if product_id not in still_sold},
+            -1,
+        )
+        if totals:
+            _apply_customer(order.customer_id, 0 if still_sold else -1, -_net_value(totals))
+
+
+def rebuild_daily_sales(start, end):
+    """Recompute DailySales for ``start``..``end`` (inclusive dates) from orders."""
+    tz = timezone.get_current_timezone()
+    since = timezone.make_aware(datetime.combine(start, time.min), tz)
+    until = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+
+    with transaction.atomic():
+        _lock_days(start, end)
+
+        orders = {
+            order_id: (created_at, discount)
+            for order_id, created_at, discount in Order.objects.filter(
+                created_at__gte=since, created_at__lt=until
+            ).values_list("id", "created_at", "discount")
+        }
+        items_by_order = defaultdict(list)
+        for item in (
+            OrderItem.objects.filter(order__created_at__gte=since, order__created_at__lt=until)
+            .values(*_ITEM_FIELDS)
+            .iterator()
+        ):
+            items_by_order[item["order_id"]].append(item)
+
+        cells = {}
+        for order_id, items in items_by_order.items():
+            created_at, order_discount = orders[order_id]
+            day = timezone.localdate(created_at, tz)
+            live = {item["id"] for item in items if item["status"] not in INACTIVE_STATUSES}
+            totals = _product_totals(order_discount or 0, items, live)
+            for product_id, (category_id, units, gross, discount) in totals.items():
+                cell = cells.setdefault(
+                    (day, product_id),
+                    DailySales(date=day, product_id=product_id, category_id=category_id),
+                )
+                cell.units += units
+                cell.gross += gross
+                cell.discount += discount
+                cell.order_count += 1
+
+        DailySales.objects.filter(date__gte=start, date__lte=end).delete()
+        DailySales.objects.bulk_create(cells.values(), batch_size=1000)
+    return len(cells)
+
+
+def rebuild_customer_stats():
+    """Recompute CustomerStats for every customer from the order tables."""
+    with transaction.atomic():
+        # Every day that has orders, so no order change lands mid-rebuild.
+        first_order_at = Order.objects.aggregate(first=Min("created_at"))["first"]
+        if first_order_at is not None:
+            _lock_days(
+                timezone.localdate(first_order_at), timezone.localdate() + timedelta(days=1)
+            )
+
+        stats = {
+            customer_id: CustomerStats(customer_id=customer_id, last_order_at=last_order_at)
+            for customer_id, last_order_at in Order.objects.values("customer_id")
+            .annotate(last=Max("created_at"))
+            .values_list("customer_id", "last")
+        }
+        items = (
+            OrderItem.objects.values(*_ITEM_FIELDS, "order__customer_id", "order__discount")
+            .order_by("order_id")
+            .iterator(chunk_size=5000)
+        )
+        for _, order_items in groupby(items, key=lambda item: item["order_id"]):
+            order_items = list(order_items)
+            live = {item["id"] for item in order_items if item["status"] not in INACTIVE_STATUSES}
+            if not live:
+                continue
+            first = order_items[0]
+            totals = _product_totals(first["order__discount"] or 0, order_items, live)
+            row = stats[first["order__customer_id"]]
+            row.order_count += 1
+            row.lifetime_value += _net_value(totals)
+
+        # Keep the latest segmentation; it is recomputed separately.
+        for customer_id, rfm_score, segment, segmented_at in CustomerStats.objects.exclude(
+            segment=""
+        ).values_list("customer_id", "rfm_score", "segment", "segmented_at"):
+            if customer_id in stats:
+                row = stats[customer_id]
+                row.rfm_score, row.segment, row.segmented_at = rfm_score, segment, segmented_at
+        CustomerStats.objects.all().delete()
+        CustomerStats.objects.bulk_create(stats.values(), batch_size=1000)
+    return len(stats)
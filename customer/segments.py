@@ -0,0 +1,164 @@
+"""
+RFM (recency, frequency, monetary) customer segmentation.
+
+The inputs are already rolled up per customer in CustomerStats (last order
+time, order count, lifetime value), so one pass over that table loads them
+into NumPy arrays. Each measure is binned into quintiles with
+``np.quantile``; equal values always share a score, so heavily tied measures
+like order count use fewer than five scores. ``SEGMENTS`` maps score
+combinations to labels with ``np.select``. Labels are written back grouped
+by score, so a run costs a few hundred UPDATEs however many customers there
+are.
+
+``issue_segment_coupons`` gives every customer in a segment a single-use
+CustomerCoupon with its own code.
+"""
+import secrets
+from base64 import b32encode
+from collections import Counter
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from aadmin.models import Coupon, CustomerCoupon
+
+from .models import CustomerStats
+
+QUANTILES = 5
+UPDATE_CHUNK = 5000
+COUPON_BATCH = 1000
+
+# First match wins; r, f and m are score arrays (1 = lowest, 5 = highest).
+SEGMENTS = [
+    ("champions", lambda r, f, m: (r >= 4) & (f >= 4) & (m >= 4)),
+    ("loyal", lambda r, f, m: (r >= 3) & (f >= 4)),
+    ("lapsed_big_spenders", lambda r, f, m: (r <= 2) & (m >= 4)),
+    ("at_risk", lambda r, f, m: (r <= 2) & (f >= 3)),
+    ("new", lambda r, f, m: (r >= 4) & (f <= 1)),
+    ("promising", lambda r, f, m: r >= 3),
+    ("hibernating", lambda r, f, m: r <= 2),
+]
+
+
+def quantile_scores(values):
+    """Score ``values`` 1..QUANTILES by quantile; higher values score higher."""
+    if not len(values):
+        return np.empty(0, dtype=np.int8)
+    edges = np.quantile(values, np.linspace(0, 1, QUANTILES + 1)[1:-1])
+    return (np.searchsorted(edges, values, side="left") + 1).astype(np.int8)
+
+
+def load_rfm_inputs():
+    """Customer ids with last order timestamp, order count and lifetime value."""
+    ids, last_order, frequency, monetary = [], [], [], []
+    for customer_id, order_count, lifetime_value, last_order_at in (
+        CustomerStats.objects.filter(order_count__gt=0, last_order_at__isnull=False)
+        .values_list("customer_id", "order_count", "lifetime_value", "last_order_at")
+        .iterator(chunk_size=10000)
+    ):
+        ids.append(customer_id)
+        frequency.append(order_count)
+        monetary.append(lifetime_value)
+        last_order.append(last_order_at.timestamp())
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(last_order, dtype=np.float64),
+        np.array(frequency, dtype=np.int64),
+        np.array(monetary, dtype=np.int64),
+    )
+
+
+def score_customers(ids, last_order, frequency, monetary):
+    """Return ``(codes, labels)``: RFM code (e.g. 545) and segment per customer."""
+    r = quantile_scores(last_order)
+    f = quantile_scores(frequency)
+    m = quantile_scores(monetary)
+    labels = np.select(
+        [condition(r, f, m) for _, condition in SEGMENTS],
+        [label for label, _ in SEGMENTS],
+        default="other",
+    )
+    codes = r.astype(np.int16) * 100 + f * 10 + m
+    return codes, labels
+
+
+def segment_customers(dry_run=False):
+    """Score every customer with orders and store the labels; returns counts per segment."""
+    ids, last_order, frequency, monetary = load_rfm_inputs()
+    codes, labels = score_customers(ids, last_order, frequency, monetary)
+    counts = Counter(labels.tolist())
+    if dry_run:
+        return counts
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Customers whose orders were all cancelled or returned drop out.
+        CustomerStats.objects.filter(order_count=0).exclude(segment="").update(
+            rfm_score="", segment="", segmented_at=now
+        )
+        # The label is a function of the code, so each code is one UPDATE per chunk.
+        unique_codes, first = np.unique(codes, return_index=True)
+        for code, index in zip(unique_codes.tolist(), first.tolist()):
+            customer_ids = ids[codes == code].tolist()
+            for start in range(0, len(customer_ids), UPDATE_CHUNK):
+                CustomerStats.objects.filter(
+                    customer_id__in=customer_ids[start:start + UPDATE_CHUNK]
+                ).update(rfm_score=str(code), segment=labels[index], segmented_at=now)
+    return counts
+
+
+def _coupon_codes(prefix, count):
+    """``count`` new codes like ``PREFIX-7KQ2M4ZP3A`` that are not in use yet."""
+    codes = set()
+    while len(codes) < count:
+        wanted = count - len(codes)
+        batch = {
+            f"{prefix}-{b32encode(secrets.token_bytes(10)).decode()[:10]}"
+            for _ in range(wanted)
+        }
+        batch -= set(Coupon.objects.filter(code__in=batch).values_list("code", flat=True))
+        codes |= batch
+    return list(codes)[:count]
+
+
+def issue_segment_coupons(segment, discount, minimum_purchase, prefix):
+    """
+    Give each customer in ``segment`` a single-use coupon, skipping customers
+    who still hold an unused one from an earlier run with the same prefix.
+    Returns the number issued.
+    """
+    customer_ids = list(
+        CustomerStats.objects.filter(segment=segment).values_list("customer_id", flat=True)
+    )
+    holders = set(
+        CustomerCoupon.objects.filter(
+            code__startswith=f"{prefix}-", is_active=True, quantity__gt=0
+        ).values_list("customer_id", flat=True)
+    )
+    customer_ids = [customer_id for customer_id in customer_ids if customer_id not in holders]
+
+    # bulk_create does not support multi-table inheritance, so create the
+    # Coupon rows in bulk and insert the CustomerCoupon rows directly.
+    table = connection.ops.quote_name(CustomerCoupon._meta.db_table)
+    columns = ", ".join(
+        connection.ops.quote_name(CustomerCoupon._meta.get_field(name).column)
+        for name in ("coupon_ptr", "customer", "is_customer_coupon")
+    )
+    issued = 0
+    for start in range(0, len(customer_ids), COUPON_BATCH):
+        batch = customer_ids[start:start + COUPON_BATCH]
+        with transaction.atomic():
+            coupons = Coupon.objects.bulk_create(
+                [
+                    Coupon(code=code, discount=discount, quantity=1, minimum_purchase=minimum_purchase)
+                    for code in _coupon_codes(prefix, len(batch))
+                ]
+            )
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {table} ({columns}) VALUES (%s, %s, %s)",
+                    [(coupon.pk, customer_id, True) for coupon, customer_id in zip(coupons, batch)],
+                )
+        issued += len(batch)
+    return issued
@@ -48,6 +48,7 @@ urlpatterns = [
     path("wallet", views.customer_wallet, name="customer_wallet"),
     path("orders/return/<int:order_id>/", views.return_order, name="return_order"),
     path("invoice/<order_id>/", views.invoice, name="invoice"),
+    path("invoice/<order_id>/pdf/", views.invoice_pdf, name="invoice_pdf"),
     path(
         "order-confirmation/<int:order_id>/",
         views.order_confirmation,
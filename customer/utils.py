@@ -1,3 +1,211 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from product.models import Inventory
+
+from .events import record_order_events
+from .sales import reverse_order_sales
+from accounts.models import Customer
+
+from .models import Cart, Order, OrderItem, Wallet, WalletTransaction
+
+
+def restore_stock(order_items):
+    """Return the quantity of each order item to stock, one UPDATE per inventory."""
+    quantities = defaultdict(int)
+    for order_item in order_items:
+        quantities[order_item.inventory_id] += order_item.quantity
+
+    for inventory_id, quantity in quantities.items():
+        Inventory.objects.filter(pk=inventory_id).update(stock=F("stock") + quantity)
+
+
+def get_request_customer(request):
+    """
+    The request user's Customer, or None, resolved with one query per request.
+
+    The Customer carries ``cart_pk`` and ``wallet_pk`` (None until created) so
+    views can reach the cart and wallet without another lookup.
+    """
+    if not hasattr(request, "_customer"):
+        customer = None
+        user = request.user
+        if user.is_authenticated and user.is_customer:
+            customer = (
+                Customer.objects.annotate(cart_pk=F("cart__id"), wallet_pk=F("wallet__id"))
+                .filter(pk=user.pk)
+                .first()
+            )
+        request._customer = customer
+    return request._customer
+
+
+def get_cart(customer):
+    """The customer's cart, created on first use."""
+    cart_pk = getattr(customer, "cart_pk", None)
+    if cart_pk is not None:
+        cart = Cart(pk=cart_pk, customer=customer)
+        cart._state.adding = False
+        return cart
+    cart, _ = Cart.objects.get_or_create(customer=customer)
+    customer.cart_pk = cart.pk
+    return cart
+
+
+def _wallet_pk(customer):
+    wallet_pk = getattr(customer, "wallet_pk", None)
+    if wallet_pk is None:
+        wallet_pk = Wallet.objects.get_or_create(customer=customer)[0].pk
+        customer.wallet_pk = wallet_pk
+    return wallet_pk
+
+
+def credit_wallet(customer, amount, reason, reference=""):
+    """Atomically add ``amount`` to the customer's wallet and record it in the ledger."""
+    if amount <= 0:
+        return
+    with transaction.atomic():
+        wallet_pk = _wallet_pk(customer)
+        Wallet.objects.filter(pk=wallet_pk).update(balance=F("balance") + amount)
+        WalletTransaction.objects.create(
+            wallet_id=wallet_pk,
+            customer=customer,
+            transaction_type="credit",
+            amount=amount,
+            reason=reason,
+            reference=str(reference),
+        )
+
+
+def debit_wallet(customer, amount, reason, reference=""):
+    """
+    Atomically take ``amount`` from the customer's wallet and record it in the ledger.
+
+    Returns False without touching the balance when it is insufficient.
+    """
+    with transaction.atomic():
+        wallet_pk = _wallet_pk(customer)
+        updated = Wallet.objects.filter(pk=wallet_pk, balance__gte=amount).update(
+            balance=F("balance") - amount
+        )
+        if not updated:
+            return False
+        WalletTransaction.objects.create(
+            wallet_id=wallet_pk,
+            customer=customer,
+            transaction_type="debit",
+            amount=amount,
+            reason=reason,
+            reference=str(reference),
+        )
+    return True
+
+
+def transition_order_items(order_item_ids, new_status):
+    """
+    Move the given order items to ``new_status`` in one transaction, with
+    their orders locked.
+
+    Items whose current status does not allow the transition are skipped.
+    Cancelled items go back to stock and paid non-COD ones are refunded to
+    the wallet. Returns the number of items that changed status.
+    """
+    allowed_from = OrderItem.statuses_allowing(new_status)
+    if not allowed_from:
+        return 0
+
+    with transaction.atomic():
+        # Lock the parent orders first, in id order, as the customer cancel and
+        # return views do, so the two paths cannot both restock the same item.
+        parent_ids = set(
+            OrderItem.objects.filter(id__in=order_item_ids).values_list("order_id", flat=True)
+        )
+        list(
+            Order.objects.select_for_update(of=("self",))
+            .filter(id__in=parent_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        locked_ids = list(
+            OrderItem.objects.select_for_update(of=("self",))
+            .filter(id__in=order_item_ids, status__in=allowed_from)
+            .values_list("id", flat=True)
+        )
+        if not locked_ids:
+            return 0
+
+        OrderItem.objects.filter(id__in=locked_ids).update(status=new_status)
+
+        order_items = list(
+            OrderItem.objects.filter(id__in=locked_ids).select_related(
+                "order__customer", "inventory"
+            )
+        )
+        if new_status == "cancelled":
+            restore_stock(order_items)
+
+            refunds = defaultdict(int)
+            for order_item in order_items:
+                order = order_item.order
+                if order.is_paid and order.payment_method != "COD":
+                    refunds[order] += order_item.quantity * order_item.inventory.price
+            for order, amount in refunds.items():
+                credit_wallet(order.customer, amount, "refund", reference=order.id)
+
+            cancelled_by_order = defaultdict(list)
+            for order_item in order_items:
+                cancelled_by_order[order_item.order].append(order_item.id)
+            for order, order_item_ids in cancelled_by_order.items():
+                reverse_order_sales(order, order_item_ids)
+
+        order_ids = {order_item.order_id for order_item in order_items}
+        Order.objects.filter(id__in=order_ids).update(updated_at=timezone.now())
+        sync_order_status(order_ids)
+
+        orders = Order.objects.in_bulk(order_ids)
+        record_order_events(
+            (
+                orders[order_item.order_id],
+                "order_item.status_changed",
+                {"order_item_id": order_item.id, "new_status": new_status},
+            )
+            for order_item in order_items
+        )
+
+    return len(locked_ids)
+
+
+def sync_order_status(order_ids):
+    """
+    Derive ``Order.status`` from its items: the shared status of the active
+    items, or "cancelled" once every item is cancelled. One UPDATE per status.
+    """
+    orders_by_status = defaultdict(list)
+    active_orders = set()
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .exclude(status="cancelled")
+        .values("order_id")
+        .annotate(statuses=Count("status", distinct=True), item_status=Max("status"))
+    )
+    for row in rows:
+        active_orders.add(row["order_id"])
+        if row["statuses"] == 1:
+            orders_by_status[row["item_status"]].append(row["order_id"])
+    orders_by_status["cancelled"] = [
+        order_id for order_id in order_ids if order_id not in active_orders
+    ]
+
+    for status, ids in orders_by_status.items():
+        if ids:
+            Order.objects.filter(id__in=ids).exclude(status=status).update(
+                status=status, updated_at=timezone.now()
+            )
+
+
 list_of_states_in_india = [
     "Andaman and Nicobar Islands",
     "Andhra Pradesh",
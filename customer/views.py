@@ -12,29 +12,47 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.db import transaction
-from django.db.models import F, Prefetch, Sum
+from django.db.models import F, Prefetch, Q, Sum
 from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
-import razorpay
+from payment.gateway import GatewayUnavailable
+from payment.models import GatewayOrder
+from payment.utils import checkout_amount, open_gateway_order
 
 from accounts.models import Customer
 from aadmin.models import CategoryOffer, Coupon
-from ecom.views import get_next_url
+from ecom.views import get_next_url, ranged_file_response
 from product.models import Inventory, Product
 
-from .models import Address, Cart, CartItem, FavouriteItem, Order, OrderItem, Wallet
-from .utils import list_of_states_in_india
+from .models import (
+    Address,
+    Cart,
+    CartItem,
+    FavouriteItem,
+    Order,
+    OrderItem,
+    Wallet,
+    WalletTransaction,
+)
+from .events import record_order_event
+from .invoices import get_invoice_pdf, invoice_version
+from .sales import INACTIVE_STATUSES, record_order_sales, reverse_order_sales
+from .utils import (
+    credit_wallet,
+    get_cart,
+    get_request_customer,
+    list_of_states_in_india,
+    restore_stock,
+)
 
 logger = logging.getLogger(__name__)
 
 
 def _get_customer(request):
     """Return the Customer for the current request user or None if not a customer."""
-    if not request.user.is_authenticated or not request.user.is_customer:
-        return None
-    return get_object_or_404(Customer, pk=request.user.pk)
+    return get_request_customer(request)
 
 
 def customer_required(view_func):
@@ -42,7 +60,7 @@ def customer_required(view_func):
         if not request.user.is_authenticated:
             return redirect('customer_login')
         
-        if request.user.is_customer and Customer.objects.filter(pk=request.user.pk).exists():
+        if get_request_customer(request) is not None:
             return view_func(request, *args, **kwargs)
 
         return redirect('customer_login')
@@ -52,7 +70,7 @@ def customer_required(view_func):
 
 @customer_required
 def dashboard(request):
-    customer = get_object_or_404(Customer, pk=request.user.pk)
+    customer = _get_customer(request)
 
     orders = (
         Order.objects.filter(customer=customer)
@@ -352,33 +370,46 @@ def orders(request):
 
 
 
+# Items in these statuses have been refunded, restocked or delivered already.
+UNCANCELLABLE_STATUSES = ("cancelled", "returned", "delivered")
+
+
 @customer_required
 @transaction.atomic
 def cancel_order(request, order_id):
     """Cancel an order; restores stock and refunds to wallet for paid non-COD."""
     customer = _get_customer(request)
-    order = get_object_or_404(Order, id=order_id, customer=customer)
-    order_items = OrderItem.objects.select_related("inventory").filter(order=order)
-    wallet, _ = Wallet.objects.get_or_create(customer=customer)
+    # Lock the order so concurrent cancels/returns of it run one at a time.
+    order = get_object_or_404(Order.objects.select_for_update(), id=order_id, customer=customer)
+    order_items = list(
+        OrderItem.objects.select_for_update(of=("self",))
+        .select_related("inventory")
+        .filter(order=order)
+        .exclude(status__in=UNCANCELLABLE_STATUSES)
+    )
+    if not order_items:
+        messages.error(request, "This order cannot be cancelled.")
+        return redirect("customer_orders")
 
+    sold_ids = [i.id for i in order_items if i.status not in INACTIVE_STATUSES]
     refund_amount = 0
     for order_item in order_items:
-        if order_item.status != "cancelled":
-            order_item.status = "cancelled"
-            order_item.inventory.stock += order_item.quantity
-            order_item.inventory.save()
-            order_item.save()
+        order_item.status = "cancelled"
 
-            # Refund only for non-COD paid orders
-            if order.is_paid and order.payment_method != "COD":
-                refund_amount += order_item.quantity * order_item.inventory.price
+        # Refund only for non-COD paid orders
+        if order.is_paid and order.payment_method != "COD":
+            refund_amount += order_item.quantity * order_item.inventory.price
+
+    OrderItem.objects.bulk_update(order_items, ["status"])
+    restore_stock(order_items)
+    reverse_order_sales(order, sold_ids)
 
     order.status = "cancelled"
     order.save()
+    record_order_event(order, "order.cancelled", refund_amount=refund_amount)
 
     if refund_amount > 0:
-        wallet.balance += refund_amount
-        wallet.save()
+        credit_wallet(customer, refund_amount, "refund", reference=order.id)
         messages.success(request, f"Order cancelled. Refund of ₹{refund_amount} added to your wallet.")
     else:
         messages.success(request, "Order cancelled successfully.")
@@ -390,34 +421,42 @@ def cancel_order(request, order_id):
 
 
 @customer_required
+@transaction.atomic
 def cancel_order_item(request, order_item_id):
     """Cancel a single order item; may mark whole order cancelled if no items left."""
     customer = _get_customer(request)
+    order = get_object_or_404(
+        Order.objects.select_for_update(of=("self",)),
+        items__id=order_item_id,
+        customer=customer,
+    )
     order_item = get_object_or_404(
-        OrderItem,
+        OrderItem.objects.select_for_update(of=("self",)).select_related("inventory"),
         id=order_item_id,
-        order__customer=customer,
+        order=order,
     )
-    order_item.order  # force load
-    wallet, _ = Wallet.objects.get_or_create(customer=customer)
 
-    if order_item.status != "cancelled":
+    if order_item.status not in UNCANCELLABLE_STATUSES:
         order_item.status = "cancelled"
+        order_item.save(update_fields=["status"])
+        restore_stock([order_item])
+        reverse_order_sales(order, [order_item.id])
 
         # Refund only for non-COD paid orders
-        if order_item.order.is_paid and order_item.order.payment_method != "COD":
-            wallet.balance += order_item.quantity * order_item.inventory.price
-            wallet.save()
-
-        order_item.inventory.stock += order_item.quantity
-        order_item.inventory.save()
-        order_item.save()
+        refund_amount = 0
+        if order.is_paid and order.payment_method != "COD":
+            refund_amount = order_item.quantity * order_item.inventory.price
+            credit_wallet(customer, refund_amount, "refund", reference=order.id)
 
-        
-        order = order_item.order
         if not OrderItem.objects.filter(order=order).exclude(status="cancelled").exists():
             order.status = "cancelled"
-            order.save()
+        order.save()
+        record_order_event(
+            order,
+            "order_item.cancelled",
+            order_item_id=order_item.id,
+            refund_amount=refund_amount,
+        )
 
     return redirect("customer_orders")
 
@@ -430,30 +469,35 @@ def cancel_order_item(request, order_item_id):
 def return_order(request, order_id):
     """Return a delivered order; restores stock and refunds to wallet for paid non-COD."""
     customer = _get_customer(request)
-    order = get_object_or_404(Order, id=order_id, customer=customer)
-    order_items = OrderItem.objects.select_related("inventory").filter(order=order)
-    wallet, _ = Wallet.objects.get_or_create(customer=customer)
+    order = get_object_or_404(Order.objects.select_for_update(), id=order_id, customer=customer)
 
     if order.status == "delivered":
-        refund_amount = 0
+        # Only delivered items go back; cancelled ones were already refunded.
+        order_items = list(
+            OrderItem.objects.select_for_update(of=("self",))
+            .select_related("inventory")
+            .filter(order=order, status="delivered")
+        )
 
+        sold_ids = [i.id for i in order_items if i.status not in INACTIVE_STATUSES]
+        refund_amount = 0
         for order_item in order_items:
-            if order_item.status != "returned":
-                order_item.status = "returned"
-                order_item.inventory.stock += order_item.quantity
-                order_item.inventory.save()
-                order_item.save()
+            order_item.status = "returned"
+
+            # Refund only for non-COD paid orders
+            if order.is_paid and order.payment_method != "COD":
+                refund_amount += order_item.quantity * order_item.inventory.price
 
-                # Refund only for non-COD paid orders
-                if order.is_paid and order.payment_method != "COD":
-                    refund_amount += order_item.quantity * order_item.inventory.price
+        OrderItem.objects.bulk_update(order_items, ["status"])
+        restore_stock(order_items)
+        reverse_order_sales(order, sold_ids)
 
         order.status = "returned"
         order.save()
+        record_order_event(order, "order.returned", refund_amount=refund_amount)
 
         if refund_amount > 0:
-            wallet.balance += refund_amount
-            wallet.save()
+            credit_wallet(customer, refund_amount, "refund", reference=order.id)
             messages.success(request, f"Order returned. Refund of ₹{refund_amount} added to your wallet.")
         else:
             messages.success(request, "Order returned successfully.")
@@ -534,7 +578,7 @@ def remove_favourite_item(request, favourite_item_id):
 def cart(request):
     """Cart page with items, primary image, available sizes, and total."""
     customer = _get_customer(request)
-    cart, _ = Cart.objects.get_or_create(customer=customer)
+    cart = get_cart(customer)
     cart_items = (
         CartItem.objects.filter(cart=cart)
         .select_related("product", "inventory")
@@ -565,9 +609,9 @@ def cart(request):
 @customer_required
 def add_to_cart(request, product_id):
     if request.method == "POST":
-        customer = get_object_or_404(Customer, email=request.user.email)
+        customer = _get_customer(request)
         product = get_object_or_404(Product, pk=product_id)
-        cart, cart_created = Cart.objects.get_or_create(customer=customer)
+        cart = get_cart(customer)
         quantity = int(request.POST.get("product-quantity"))
         size = request.POST.get("product-size")
 
@@ -657,7 +701,7 @@ def remove_cart_item(request, cart_item_id):
 def checkout(request):
     """Checkout: cart summary, addresses, payment method, category offers and wallet."""
     customer = _get_customer(request)
-    cart, _ = Cart.objects.get_or_create(customer=customer)
+    cart = get_cart(customer)
     cart_items = (
         CartItem.objects.filter(cart=cart)
         .select_related("product", "product__main_category", "inventory")
@@ -691,7 +735,6 @@ def checkout(request):
     cart.total_amount = total_amount
     cart.total_offer = total_offer
     cart.remaining_amount = total_amount - total_offer
-    cart.save()
 
     addresses = Address.objects.filter(customer=customer)
     return render(request, "customer/checkout.html", {
@@ -726,31 +769,25 @@ def place_order(request):
     request.session["payment_method"] = payment_method
 
     try:
-        cart = Cart.objects.get(customer=request.user)
+        cart = get_cart(_get_customer(request))
         cart_items = CartItem.objects.filter(cart=cart)
 
         if not cart_items.exists():
             messages.error(request, "Your cart is empty!")
             return redirect("checkout")
 
-        total_amount = cart_items.aggregate(
-            total=Sum(F("quantity") * F("inventory__price"))
-        )["total"] or 0
-
-        # Category offers
-        total_offer = 0
-        for item in cart_items:
-            offer = CategoryOffer.objects.filter(
-                category=item.product.main_category
-            ).first()
-            if offer:
-                total_offer += round(item.quantity * item.inventory.price * offer.discount / 100)
-
-        total_amount -= total_offer
+        # Cart total less category offers; razorpay_order_creation charges the same.
+        total_amount = checkout_amount(_get_customer(request))
 
         # Coupon
         if coupon_code:
-            coupon = Coupon.objects.filter(code=coupon_code, is_active=True).first()
+            # Customer coupons (e.g. issued per RFM segment) only work for their owner.
+            coupon = Coupon.objects.filter(
+                Q(customercoupon__isnull=True)
+                | Q(customercoupon__customer=_get_customer(request)),
+                code=coupon_code,
+                is_active=True,
+            ).first()
 
             if not coupon:
                 messages.error(request, "Invalid coupon code.")
@@ -794,7 +831,7 @@ def place_order(request):
             return redirect("finalize_order")
 
         if payment_method == "razorpay":
-            return redirect("razorpay_order_creation", amount=total_amount)
+            return redirect("razorpay_order_creation")
 
         messages.error(request, "Invalid payment method")
         return redirect("checkout")
@@ -817,6 +854,27 @@ def create_order(request):
     coupon_code = request.session.get("coupon_code")
 
     customer = _get_customer(request)
+
+    gateway_order = None
+    razorpay_order_id = request.session.get("razorpay_order_id")
+    if payment_method == "razorpay":
+        # Lock the paid checkout so a replayed callback cannot create a second order.
+        gateway_order = (
+            GatewayOrder.objects.select_for_update()
+            .select_related("order")
+            .filter(
+                razorpay_order_id=razorpay_order_id,
+                customer=customer,
+                purpose="checkout",
+                status="paid",
+            )
+            .first()
+        )
+        if gateway_order is None:
+            return None
+        if gateway_order.order_id:
+            return gateway_order.order
+
     address = get_object_or_404(Address, id=address_id, customer=customer)
     cart = get_object_or_404(Cart, customer=customer)
     cart_items = CartItem.objects.select_related(
@@ -857,7 +915,14 @@ def create_order(request):
         item.inventory.stock -= item.quantity
         item.inventory.save()
 
+    record_order_sales(order)
+
+    if gateway_order is not None:
+        gateway_order.order = order
+        gateway_order.save(update_fields=["order"])
+
     cart_items.delete()
+    record_order_event(order, "order.created")
     return order
 
 
@@ -887,6 +952,7 @@ def finalize_order(request):
         "address_id",
         "coupon_code",
         "discount",
+        "razorpay_order_id",
     ]:
         request.session.pop(key, None)
 
@@ -907,9 +973,6 @@ def order_confirmation(request, order_id):
     return HttpResponseRedirect(reverse("payment_success"))
 
 
-razorpay_client = razorpay.Client(
-    auth=(settings.RAZOR_KEY_ID, settings.RAZOR_KEY_SECRET)
-)
 
 
 
@@ -918,24 +981,15 @@ razorpay_client = razorpay.Client(
 
 @customer_required
 def customer_wallet(request):
-    """Wallet balance and top-up; lists recent refunded order items."""
+    """Wallet balance and top-up; lists the wallet's ledger history."""
     customer = _get_customer(request)
     wallet, _ = Wallet.objects.get_or_create(customer=customer)
-    order_items = (
-        OrderItem.objects.filter(
-            order__customer=customer,
-            status="cancelled",
-            order__is_paid=True,
-        )
-        .exclude(order__payment_method="COD")
-        .select_related("order", "product", "inventory")
-        .order_by("-id")
-    )
+    transactions = WalletTransaction.objects.filter(customer=customer)[:50]
 
     context = {
         "customer": customer,
         "wallet": wallet,
-        "order_items": order_items,
+        "transactions": transactions,
     }
 
     if request.method == "POST":
@@ -944,19 +998,28 @@ def customer_wallet(request):
         if amount > 0:
             currency = "INR"
 
-            razorpay_order = razorpay_client.order.create({
-                "amount": amount * 100,
-                "currency": currency,
-                "payment_capture": 1,
-                "receipt": f"wallet_{customer.id}"
-            })
+            try:
+                gateway_order = open_gateway_order(
+                    customer,
+                    "wallet_topup",
+                    amount,
+                    currency=currency,
+                    receipt=f"wallet_{customer.id}",
+                    payment_capture=1,
+                )
+            except GatewayUnavailable:
+                logger.exception("Razorpay wallet top-up order creation failed")
+                messages.error(
+                    request, "Payment gateway is unavailable. Please try again shortly."
+                )
+                return render(request, "customer/customer-wallet.html", context)
 
             # store wallet top-up info in session
             request.session["wallet_topup"] = True
             request.session["wallet_amount"] = amount
 
             context.update({
-                "razorpay_order_id": razorpay_order["id"],
+                "razorpay_order_id": gateway_order.razorpay_order_id,
                 "razorpay_merchant_key": settings.RAZOR_KEY_ID,
                 "razorpay_amount": amount * 100,
                 "currency": currency,
@@ -989,3 +1052,18 @@ def invoice(request, order_id):
         order.sub_total += oi.quantity * oi.inventory.price
 
     return render(request, "customer/invoice.html", {"order": order})
+
+
+
+@customer_required
+def invoice_pdf(request, order_id):
+    """Invoice PDF, rendered once per order version and then served from disk."""
+    customer = _get_customer(request)
+    order = get_object_or_404(Order, id=order_id, customer=customer)
+    return ranged_file_response(
+        request,
+        get_invoice_pdf(order),
+        content_type="application/pdf",
+        filename=f"order_invoice_{order.id}.pdf",
+        etag=invoice_version(order),
+    )
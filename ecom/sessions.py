@@ -0,0 +1,110 @@
+"""
+Session engine: cached sessions with change detection and write-behind.
+
+Built on Django's ``cached_db`` engine with two differences:
+
+* ``save()`` is a no-op when the session data is unchanged since it was
+  loaded, so views that re-assign the same values cost nothing.
+* Changes to existing sessions go to the cache immediately, but are only
+  written to the database after ``SESSION_WRITE_BEHIND_SECONDS``, in one
+  bulk upsert for every session that became due in this process. New
+  sessions are still written through so their keys are reserved.
+
+Settings only select this engine when a cache shared by all workers
+(``REDIS_URL``) is configured; otherwise sessions use the plain database
+engine. Expired rows are removed in one DELETE by ``manage.py clearsessions``.
+"""
+import atexit
+import copy
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ecom.sessions"
+
+_dirty = {}  # session_key -> monotonic time it first changed since its last flush
+_dirty_lock = threading.Lock()
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def load(self):
+        data = super().load()
+        self._loaded_data = copy.deepcopy(data)
+        return data
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None:
+            super().save(must_create)
+            self._loaded_data = copy.deepcopy(self._get_session(no_load=True))
+            return
+
+        data = self._get_session()
+        if data == getattr(self, "_loaded_data", None):
+            return
+
+        self._cache.set(self.cache_key, data, self.get_expiry_age())
+        self._loaded_data = copy.deepcopy(data)
+        if settings.SESSION_WRITE_BEHIND_SECONDS <= 0:
+            super(CachedDBStore, self).save()
+            return
+
+        with _dirty_lock:
+            _dirty.setdefault(self.session_key, time.monotonic())
+        flush_dirty_sessions()
+
+    def delete(self, session_key=None):
+        with _dirty_lock:
+            _dirty.pop(session_key or self.session_key, None)
+        super().delete(session_key)
+
+
+def flush_dirty_sessions(force=False):
+    """Write sessions whose write-behind delay has passed (all if ``force``)."""
+    now = time.monotonic()
+    with _dirty_lock:
+        due = [
+            key
+            for key, since in _dirty.items()
+            if force or now - since >= settings.SESSION_WRITE_BEHIND_SECONDS
+        ]
+        for key in due:
+            del _dirty[key]
+    if not due:
+        return 0
+
+    cache = caches[settings.SESSION_CACHE_ALIAS]
+    cached = cache.get_many([KEY_PREFIX + key for key in due])
+
+    rows = []
+    for key in due:
+        data = cached.get(KEY_PREFIX + key)
+        if data is None:  # deleted or evicted; nothing newer than the DB copy
+            continue
+        store = SessionStore(key)
+        store._session_cache = data
+        rows.append(store.create_model_instance(data))
+
+    Session.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["session_key"],
+        update_fields=["session_data", "expire_date"],
+    )
+    return len(rows)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush_dirty_sessions(force=True)
+    except Exception:
+        logger.exception("Could not flush pending sessions on exit")
@@ -147,6 +147,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 RAZOR_KEY_ID = os.environ.get("RAZOR_KEY_ID")
 RAZOR_KEY_SECRET = os.environ.get("RAZOR_KEY_SECRET")
+RAZOR_WEBHOOK_SECRET = os.environ.get("RAZOR_WEBHOOK_SECRET")
+
+# Gateway adapter (payment/gateway.py). Set RAZOR_API_BASE_URL to e.g.
+# http://127.0.0.1:8765 to use the local `manage.py fake_razorpay` server.
+RAZOR_API_BASE_URL = os.environ.get("RAZOR_API_BASE_URL")
+RAZOR_CONNECT_TIMEOUT = float(os.environ.get("RAZOR_CONNECT_TIMEOUT", 3.05))
+RAZOR_READ_TIMEOUT = float(os.environ.get("RAZOR_READ_TIMEOUT", 10))
+RAZOR_MAX_RETRIES = int(os.environ.get("RAZOR_MAX_RETRIES", 2))
+RAZOR_CIRCUIT_FAILURE_THRESHOLD = 5
+RAZOR_CIRCUIT_RESET_SECONDS = 30
+# How long an unpaid Razorpay order is reused for retries of the same payment.
+RAZOR_ORDER_REUSE_SECONDS = int(os.environ.get("RAZOR_ORDER_REUSE_SECONDS", 900))
 
 # To allow RazorPay Pop-up to restrict comment the below line.
 SECURE_CROSS_ORIGIN_OPENER_POLICY = "same-origin-allow-popups"
@@ -176,5 +188,78 @@ LOGIN_URL = 'customer_login'
 LOGOUT_REDIRECT_URL = 'customer_dashboard'
 
 
+# Shared cache for sessions and rate limiting; without REDIS_URL each
+# process keeps its own.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+
+# With a shared cache, sessions live there and changes reach the database in
+# batches after SESSION_WRITE_BEHIND_SECONDS (0 writes through); see
+# ecom/sessions.py. A per-process cache would let workers serve each other
+# stale sessions and lose unflushed changes, so use the database directly.
+if os.environ.get("REDIS_URL"):
+    SESSION_ENGINE = "ecom.sessions"
+    SESSION_WRITE_BEHIND_SECONDS = int(os.environ.get("SESSION_WRITE_BEHIND_SECONDS", 30))
+else:
+    SESSION_ENGINE = "django.contrib.sessions.backends.db"
+    SESSION_WRITE_BEHIND_SECONDS = 0
+
+# How stale the admin analytics cube may get (see aadmin/analytics.py).
+ANALYTICS_REFRESH_SECONDS = int(os.environ.get("ANALYTICS_REFRESH_SECONDS", 60))
+
+# Admin list pagination (see aadmin/pagination.py): how long counts are
+# cached, and the planner estimate above which counting is skipped.
+PAGINATOR_COUNT_CACHE_SECONDS = int(os.environ.get("PAGINATOR_COUNT_CACHE_SECONDS", 30))
+PAGINATOR_ESTIMATE_THRESHOLD = int(os.environ.get("PAGINATOR_ESTIMATE_THRESHOLD", 100000))
+
+# Folder that image paths in uploaded catalog CSVs are resolved against
+# (see aadmin/catalog_import.py); images must be copied there first.
+CATALOG_IMPORT_IMAGE_ROOT = os.environ.get(
+    "CATALOG_IMPORT_IMAGE_ROOT", str(BASE_DIR / "media" / "imports" / "images")
+)
+
+# Cached invoice PDFs (see customer/invoices.py). Keep this outside
+# MEDIA_ROOT: invoices are only served through the ownership-checked view.
+INVOICE_ROOT = os.environ.get("INVOICE_ROOT", str(BASE_DIR / "private" / "invoices"))
+
+# Account view throttling (see accounts/ratelimit.py).
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "True") == "True"
+# Only enable behind a proxy that overwrites X-Forwarded-For.
+RATE_LIMIT_TRUST_FORWARDED_FOR = (
+    os.environ.get("RATE_LIMIT_TRUST_FORWARDED_FOR", "False") == "True"
+)
+
+
 SENDGRID_API_KEY = os.environ.get("SENDGRID_API_KEY")
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL")
+
+# Outbound email queue (see accounts/mail.py). For offline runs use
+# EMAIL_OUTBOX_BACKEND=accounts.mail.DjangoMailBackend together with
+# EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend, or the
+# default SMTP backend pointed at a local sink via EMAIL_HOST/EMAIL_PORT.
+EMAIL_OUTBOX_BACKEND = os.environ.get(
+    "EMAIL_OUTBOX_BACKEND", "accounts.mail.SendGridBackend"
+)
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", BASE_DIR / "sent_emails")
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", 25))
+
+
+# Order event outbox (see customer/events.py)
+
+ORDER_EVENT_HANDLERS = [
+    "customer.events.log_event",
+    "customer.events.email_customer",
+    "customer.events.post_to_webhooks",
+]
+ORDER_EVENT_WEBHOOK_URLS = [
+    url for url in os.environ.get("ORDER_EVENT_WEBHOOK_URLS", "").split(",") if url
+]
@@ -1,6 +1,13 @@
-"""Project-level helper views (next-url helper, custom 404)."""
+"""Project-level helper views (next-url helper, custom 404, ranged file serving)."""
 
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
 from django.shortcuts import render
+from django.utils.http import parse_etags
+
+RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
 
 
 def get_next_url(request):
@@ -11,3 +18,52 @@ def get_next_url(request):
 def custom_404(request, exception):
     """Render project-wide 404 page."""
     return render(request, "home/404.html", {})
+
+
+def ranged_file_response(request, path, content_type, filename, etag):
+    """
+    Serve a file from disk as an attachment with ETag revalidation and
+    single byte-range (206) support.
+    """
+    quoted_etag = f'"{etag}"'
+    if quoted_etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+        response["ETag"] = quoted_etag
+        return response
+
+    size = os.path.getsize(path)
+    match = RANGE_RE.fullmatch(request.headers.get("Range", "").strip())
+    if_range = request.headers.get("If-Range")
+
+    if match and any(match.groups()) and if_range in (None, quoted_etag):
+        start, end = match.groups()
+        if start:
+            start = int(start)
+            end = min(int(end), size - 1) if end else size - 1
+        else:
+            start = max(size - int(end), 0)
+            end = size - 1 if int(end) else -1
+
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        with open(path, "rb") as file:
+            file.seek(start)
+            data = file.read(end - start + 1)
+        response = HttpResponse(data, status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    else:
+        response = FileResponse(
+            open(path, "rb"),
+            content_type=content_type,
+            as_attachment=True,
+            filename=filename,
+        )
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = quoted_etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,197 @@
+"""
+Razorpay gateway adapter.
+
+Wraps the Razorpay SDK client so that every outbound call:
+
+* reuses a pooled HTTP session (one per process, created on first use),
+* is bounded by a connect/read timeout,
+* is retried a few times with exponential backoff and full jitter on
+  connection errors, timeouts and 5xx responses, and
+* goes through a per-process circuit breaker, so a gateway outage fails fast
+  with ``GatewayUnavailable`` instead of tying up every worker.
+
+Point ``RAZOR_API_BASE_URL`` at ``manage.py fake_razorpay`` to run checkout
+against a local stand-in.
+"""
+import logging
+import random
+import threading
+import time
+from functools import lru_cache
+
+import razorpay
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    razorpay.errors.ServerError,
+    razorpay.errors.GatewayError,
+    ValueError,  # non-JSON body, e.g. an HTML 502 page from a proxy
+)
+
+
+class GatewayUnavailable(Exception):
+    """The gateway could not be reached, or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Minimal thread-safe circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_timeout`` seconds; then lets a single trial call through
+    (half-open) and closes again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every request."""
+
+    def __init__(self, timeout, pool_size):
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class RazorpayGateway:
+    def __init__(
+        self,
+        key_id,
+        key_secret,
+        webhook_secret=None,
+        base_url=None,
+        timeout=(3.05, 10),
+        max_retries=2,
+        backoff=0.2,
+        pool_size=10,
+        failure_threshold=5,
+        reset_timeout=30,
+    ):
+        self.key_id = key_id
+        self.webhook_secret = webhook_secret
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        options = {"base_url": base_url} if base_url else {}
+        self.client = razorpay.Client(
+            session=TimeoutSession(timeout, pool_size),
+            auth=(key_id, key_secret),
+            **options,
+        )
+
+    def _call(self, func, *args, **kwargs):
+        if not self.breaker.allow():
+            raise GatewayUnavailable("Payment gateway circuit is open")
+
+        settled = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    result = func(*args, **kwargs)
+                except RETRYABLE_ERRORS as exc:
+                    if attempt == self.max_retries:
+                        self.breaker.record_failure()
+                        settled = True
+                        raise GatewayUnavailable(str(exc)) from exc
+                    delay = random.uniform(0, self.backoff * 2 ** attempt)
+                    logger.warning(
+                        "Razorpay call failed (%s), retrying in %.2fs", exc, delay
+                    )
+                    time.sleep(delay)
+                except razorpay.errors.BadRequestError:
+                    # A 4xx means the gateway is up; the request itself was rejected.
+                    self.breaker.record_success()
+                    settled = True
+                    raise
+                else:
+                    self.breaker.record_success()
+                    settled = True
+                    return result
+        finally:
+            # Anything unexpected still has to release a half-open trial slot.
+            if not settled:
+                self.breaker.record_failure()
+
+    def create_order(self, amount, currency="INR", receipt="", **extra):
+        """
+        Create a gateway order for ``amount`` paise.
+
+        A retried create can leave an unused order behind on the gateway; that
+        is harmless, unpaid orders simply expire.
+        """
+        data = {"amount": amount, "currency": currency, "receipt": receipt, **extra}
+        return self._call(self.client.order.create, data)
+
+    def fetch_payments(self, **params):
+        return self._call(self.client.payment.all, params)
+
+    def verify_payment_signature(self, params):
+        """Local HMAC check; raises razorpay.errors.SignatureVerificationError."""
+        return self.client.utility.verify_payment_signature(params)
+
+    def verify_webhook_signature(self, body, signature):
+        """Local HMAC check of a webhook body against the webhook secret."""
+        if not self.webhook_secret:
+            raise razorpay.errors.SignatureVerificationError("Webhook secret not configured")
+        return self.client.utility.verify_webhook_signature(
+            body, signature, self.webhook_secret
+        )
+
+
+@lru_cache(maxsize=None)
+def get_gateway():
+    """Process-wide gateway, built on first use rather than at import time."""
+    return RazorpayGateway(
+        settings.RAZOR_KEY_ID,
+        settings.RAZOR_KEY_SECRET,
+        webhook_secret=settings.RAZOR_WEBHOOK_SECRET,
+        base_url=settings.RAZOR_API_BASE_URL,
+        timeout=(settings.RAZOR_CONNECT_TIMEOUT, settings.RAZOR_READ_TIMEOUT),
+        max_retries=settings.RAZOR_MAX_RETRIES,
+        failure_threshold=settings.RAZOR_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.RAZOR_CIRCUIT_RESET_SECONDS,
+    )
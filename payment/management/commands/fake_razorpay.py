@@ -0,0 +1,211 @@
+"""
+Local stand-in for the Razorpay REST API, for offline load and failure testing.
+
+Implements the endpoints the app uses:
+
+    POST /v1/orders                   create an order
+    GET  /v1/orders/<id>              fetch an order
+    GET  /v1/payments                 list payments (from, to, count, skip)
+
+plus a test-only helper that "pays" an order and returns the callback
+fields (payment id and a valid signature for RAZOR_KEY_SECRET):
+
+    POST /_fake/orders/<id>/pay
+
+Latency and failures can be injected to exercise timeouts, retries and the
+circuit breaker:
+
+    python manage.py fake_razorpay --port 8765 --latency 0.2 --failure-rate 0.1
+    RAZOR_API_BASE_URL=http://127.0.0.1:8765 python manage.py runserver
+"""
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class FakeRazorpayState:
+    def __init__(self, key_secret):
+        self.key_secret = key_secret
+        self.orders = {}
+        self.payments = []
+        self.lock = threading.Lock()
+
+    def create_order(self, data):
+        order = {
+            "id": f"order_{uuid.uuid4().hex[:14]}",
+            "entity": "order",
+            "amount": int(data.get("amount", 0)),
+            "amount_paid": 0,
+            "amount_due": int(data.get("amount", 0)),
+            "currency": data.get("currency", "INR"),
+            "receipt": data.get("receipt"),
+            "notes": data.get("notes", []),
+            "status": "created",
+            "attempts": 0,
+            "created_at": int(time.time()),
+        }
+        with self.lock:
+            self.orders[order["id"]] = order
+        return order
+
+    def pay_order(self, order_id):
+        with self.lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return None
+            payment = {
+                "id": f"pay_{uuid.uuid4().hex[:14]}",
+                "entity": "payment",
+                "amount": order["amount"],
+                "currency": order["currency"],
+                "status": "captured",
+                "order_id": order_id,
+                "method": "card",
+                "captured": True,
+                "created_at": int(time.time()),
+            }
+            order.update(status="paid", amount_paid=order["amount"], amount_due=0)
+            self.payments.append(payment)
+
+        signature = hmac.new(
+            self.key_secret.encode(),
+            f"{order_id}|{payment['id']}".encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        return {
+            "razorpay_order_id": order_id,
+            "razorpay_payment_id": payment["id"],
+            "razorpay_signature": signature,
+            "payment": payment,
+        }
+
+    def list_payments(self, params):
+        since = int(params.get("from", 0))
+        until = int(params.get("to", 2 ** 31))
+        count = min(int(params.get("count", 10)), 100)
+        skip = int(params.get("skip", 0))
+        with self.lock:
+            matching = [
+                payment
+                for payment in self.payments
+                if since <= payment["created_at"] <= until
+            ]
+        matching.sort(key=lambda payment: payment["created_at"], reverse=True)
+        items = matching[skip:skip + count]
+        return {"entity": "collection", "count": len(items), "items": items}
+
+
+def make_handler(state, latency, failure_rate):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _simulate_gateway(self):
+            """Apply injected latency; return True if this call should fail."""
+            if latency:
+                time.sleep(random.uniform(0, 2 * latency))
+            if random.random() < failure_rate:
+                self._send(
+                    500,
+                    {"error": {"code": "SERVER_ERROR", "description": "Injected failure"}},
+                )
+                return True
+            return False
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            return json.loads(raw or b"{}")
+
+        def do_POST(self):
+            path = urlparse(self.path).path.rstrip("/")
+            data = self._read_json()
+
+            if path == "/v1/orders":
+                if self._simulate_gateway():
+                    return
+                return self._send(200, state.create_order(data))
+
+            parts = path.split("/")
+            if len(parts) == 5 and parts[1] == "_fake" and parts[4] == "pay":
+                result = state.pay_order(parts[3])
+                if result is None:
+                    return self._send(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "No such order"}})
+                return self._send(200, result)
+
+            self._send(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path.rstrip("/")
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+            if path == "/v1/payments":
+                if self._simulate_gateway():
+                    return
+                return self._send(200, state.list_payments(params))
+
+            if path.startswith("/v1/orders/"):
+                if self._simulate_gateway():
+                    return
+                order = state.orders.get(path.rsplit("/", 1)[-1])
+                if order is None:
+                    return self._send(400, {"error": {"code": "BAD_REQUEST_ERROR", "description": "The id provided does not exist"}})
+                return self._send(200, order)
+
+            self._send(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}})
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = "Run a local fake Razorpay API server for offline testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Mean injected latency in seconds (uniform 0..2x).",
+        )
+        parser.add_argument(
+            "--failure-rate",
+            type=float,
+            default=0.0,
+            help="Fraction of API calls that return HTTP 500.",
+        )
+
+    def handle(self, *args, **options):
+        state = FakeRazorpayState(settings.RAZOR_KEY_SECRET or "fake_secret")
+        handler = make_handler(state, options["latency"], options["failure_rate"])
+        server = ThreadingHTTPServer((options["host"], options["port"]), handler)
+        self.stdout.write(
+            f"Fake Razorpay listening on http://{options['host']}:{options['port']}"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
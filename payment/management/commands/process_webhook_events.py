@@ -0,0 +1,40 @@
+"""
+Settle stored Razorpay webhook events in batches.
+
+The webhook view only verifies and stores deliveries; this command applies
+them. Run once from cron or with ``--loop`` as a worker.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from payment.webhooks import process_webhook_batch
+
+
+class Command(BaseCommand):
+    help = "Process pending Razorpay webhook events."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling instead of exiting once the queue is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep between polls when idle (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed, failed = process_webhook_batch(options["batch_size"])
+            if processed or failed:
+                self.stdout.write(f"Processed {processed}, failed {failed}.")
+                continue
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
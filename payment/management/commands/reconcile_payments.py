@@ -0,0 +1,70 @@
+"""
+Nightly safety net for missed callbacks and webhooks.
+
+Pages through captured Razorpay payments for the window, settles any
+GatewayOrder still marked as created, and refunds paid checkouts that
+never produced an order.
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from payment.gateway import get_gateway
+from payment.models import GatewayOrder
+from payment.webhooks import refund_orphaned_checkouts, settle_gateway_order
+
+PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = "Reconcile local gateway orders against Razorpay payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=26)
+        parser.add_argument("--orphan-grace-hours", type=int, default=24)
+
+    def handle(self, *args, **options):
+        gateway = get_gateway()
+        until = int(time.time())
+        since = until - options["hours"] * 3600
+
+        settled = 0
+        unknown = []
+        skip = 0
+        while True:
+            page = gateway.fetch_payments(
+                **{"from": since, "to": until, "count": PAGE_SIZE, "skip": skip}
+            )
+            payments = [
+                p for p in page.get("items", [])
+                if p.get("status") == "captured" and p.get("order_id")
+            ]
+            by_order = {p["order_id"]: p["id"] for p in payments}
+
+            local = dict(
+                GatewayOrder.objects.filter(
+                    razorpay_order_id__in=by_order
+                ).values_list("razorpay_order_id", "status")
+            )
+            unknown.extend(order_id for order_id in by_order if order_id not in local)
+            pending = [o for o, status in local.items() if status == "created"]
+
+            for order_id in pending:
+                _, newly_paid = settle_gateway_order(order_id, by_order[order_id])
+                settled += newly_paid
+
+            if len(page.get("items", [])) < PAGE_SIZE:
+                break
+            skip += PAGE_SIZE
+
+        refunded = refund_orphaned_checkouts(
+            timedelta(hours=options["orphan_grace_hours"])
+        )
+
+        self.stdout.write(
+            f"Settled {settled} missed payments, "
+            f"refunded {refunded} orphaned checkouts."
+        )
+        for order_id in unknown:
+            self.stdout.write(self.style.WARNING(f"Unknown Razorpay order {order_id}"))
@@ -0,0 +1,48 @@
+# Generated by Django 5.1 on 2026-10-19 16:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0002_remove_customer_approved'),
+        ('customer', '0008_order_event_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GatewayOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('razorpay_order_id', models.CharField(max_length=40, unique=True)),
+                ('purpose', models.CharField(choices=[('checkout', 'checkout'), ('pay_now', 'pay_now'), ('wallet_topup', 'wallet_topup')], max_length=20)),
+                ('amount', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('created', 'created'), ('paid', 'paid'), ('refunded', 'refunded')], default='created', max_length=10)),
+                ('razorpay_payment_id', models.CharField(blank=True, max_length=40)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.customer')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='customer.order')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=64, unique=True)),
+                ('event_type', models.CharField(max_length=64)),
+                ('payload', models.JSONField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['processed_at', 'id'], name='payment_web_process_190974_idx')],
+            },
+        ),
+    ]
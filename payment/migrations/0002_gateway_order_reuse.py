@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-19 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_remove_customer_approved'),
+        ('customer', '0008_order_event_outbox'),
+        ('payment', '0001_gateway_orders_and_webhooks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gatewayorder',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gatewayorder',
+            name='quote_version',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='gatewayorder',
+            index=models.Index(fields=['customer', 'purpose', 'amount', 'quote_version'], name='payment_gat_custome_4f351b_idx'),
+        ),
+    ]
@@ -1,3 +1,63 @@
 from django.db import models
 
-# Create your models here.
+from accounts.models import Customer
+from customer.models import Order
+
+
+class GatewayOrder(models.Model):
+    """A Razorpay order created by us, and what paying it should do."""
+
+    PURPOSE_CHOICES = [
+        ("checkout", "checkout"),
+        ("pay_now", "pay_now"),
+        ("wallet_topup", "wallet_topup"),
+    ]
+    STATUS_CHOICES = [
+        ("created", "created"),
+        ("paid", "paid"),
+        ("refunded", "refunded"),
+    ]
+
+    razorpay_order_id = models.CharField(max_length=40, unique=True)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    amount = models.PositiveIntegerField()
+    order = models.ForeignKey(
+        Order, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    # Fingerprint of what is being paid for (cart contents, order id); an
+    # unexpired "created" row with the same key is reused on retry.
+    quote_version = models.CharField(max_length=64, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="created")
+    razorpay_payment_id = models.CharField(max_length=40, blank=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "purpose", "amount", "quote_version"]),
+        ]
+
+    def __str__(self):
+        return f"{self.razorpay_order_id} ({self.purpose}, {self.status})"
+
+
+class WebhookEvent(models.Model):
+    """Raw Razorpay webhook delivery, stored on receipt and processed later."""
+
+    event_id = models.CharField(max_length=64, unique=True)
+    event_type = models.CharField(max_length=64)
+    payload = models.JSONField()
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["processed_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.event_id})"
@@ -3,7 +3,7 @@ from . import views
 
 urlpatterns = [
     path(
-        "razorpay-order-creation/<int:amount>/",
+        "razorpay-order-creation/",
         views.razorpay_order_creation,
         name="razorpay_order_creation",
     ),
@@ -12,6 +12,7 @@ urlpatterns = [
         views.razorpay_paymenthandler,
         name="razorpay_paymenthandler",
     ),
+    path("razorpay-webhook/", views.razorpay_webhook, name="razorpay_webhook"),
     path("cash-on-delivery/", views.cash_on_delivery, name="cash_on_delivery"),
     path("pay-now/<int:order_id>/", views.pay_now, name="pay_now"),
     path("payment-success/", views.payment_success, name="payment_success"),
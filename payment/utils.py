@@ -0,0 +1,78 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from aadmin.models import CategoryOffer
+from customer.models import CartItem
+
+from .gateway import get_gateway
+from .models import GatewayOrder
+
+
+def checkout_quote_version(customer, discount=0, coupon_code=None):
+    """Fingerprint of the customer's cart as priced right now."""
+    lines = CartItem.objects.filter(cart__customer=customer).values_list(
+        "inventory_id", "quantity", "inventory__price"
+    ).order_by("inventory_id")
+    raw = "|".join(f"{i}:{q}:{p}" for i, q, p in lines)
+    raw += f"|discount={discount}|coupon={coupon_code or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def checkout_amount(customer, discount=0):
+    """
+    What the customer's cart costs right now: line totals less category
+    offers and ``discount``, in whole rupees, never below zero.
+    """
+    cart_items = CartItem.objects.filter(cart__customer=customer).values_list(
+        "quantity", "inventory__price", "product__main_category_id"
+    )
+    offers = dict(
+        CategoryOffer.objects.filter(
+            category_id__in={category_id for _, _, category_id in cart_items}
+        ).values_list("category_id", "discount")
+    )
+    total = 0
+    for quantity, price, category_id in cart_items:
+        amount = quantity * price
+        total += amount - round(amount * offers.get(category_id, 0) / 100)
+    return max(total - discount, 0)
+
+
+def open_gateway_order(customer, purpose, amount, quote_version="", order_id=None, **options):
+    """
+    Return an unpaid, unexpired GatewayOrder for this exact payment, creating
+    the Razorpay order only when none can be reused.
+
+    ``amount`` is in rupees; ``options`` are passed to ``order.create``.
+    Raises GatewayUnavailable if a new order is needed and Razorpay is down.
+    """
+    now = timezone.now()
+    gateway_order = (
+        GatewayOrder.objects.filter(
+            customer=customer,
+            purpose=purpose,
+            amount=amount,
+            quote_version=quote_version,
+            order_id=order_id,
+            status="created",
+            expires_at__gt=now,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if gateway_order is not None:
+        return gateway_order
+
+    razorpay_order = get_gateway().create_order(amount * 100, **options)
+    return GatewayOrder.objects.create(
+        razorpay_order_id=razorpay_order["id"],
+        customer=customer,
+        purpose=purpose,
+        amount=amount,
+        quote_version=quote_version,
+        order_id=order_id,
+        expires_at=now + timedelta(seconds=settings.RAZOR_ORDER_REUSE_SECONDS),
+    )
@@ -1,40 +1,89 @@
 """Payment views: Razorpay, COD, and wallet-based flows for customers."""
 
+import hashlib
+import json
 import logging
 
 import razorpay
 from django.conf import settings
 from django.contrib import messages
 from django.db import transaction
-from django.http import HttpResponse, HttpResponseBadRequest, Http404
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 
 from accounts.models import Customer
 from customer.models import Cart, CartItem, Order, OrderItem, Wallet
+from customer.utils import credit_wallet, debit_wallet, get_request_customer
 from customer.views import customer_required
 
+from .gateway import GatewayUnavailable, get_gateway
+from .utils import checkout_amount, checkout_quote_version, open_gateway_order
+from .webhooks import record_webhook, settle_gateway_order
 
+logger = logging.getLogger(__name__)
 
 
 
 
-razorpay_client = razorpay.Client(
-    auth=(settings.RAZOR_KEY_ID, settings.RAZOR_KEY_SECRET)
-)
 
 
 @customer_required
-def razorpay_order_creation(request, amount):
-    """Create a Razorpay order and render payment page."""
+def razorpay_order_creation(request):
+    """
+    Create a Razorpay order and render payment page.
+
+    The amount is the unpaid order's total for "pay now", otherwise the cart
+    total as priced right now; it is never taken from the request.
+    """
     currency = "INR"
-    amount = int(amount) * 100
+    customer = get_request_customer(request)
 
-    data = {"amount": amount, "currency": currency, "receipt": str(request.user.id)}
-    razorpay_order = razorpay_client.order.create(data)
+    pay_now_order_id = request.session.get("order_id") if request.session.get("pay_now") else None
+    if pay_now_order_id:
+        order = get_object_or_404(Order, id=pay_now_order_id, customer=customer)
+        if order.is_paid:
+            messages.info(request, "This order has already been paid.")
+            return redirect("customer_orders")
+        purpose, quote_version = "pay_now", f"order-{pay_now_order_id}"
+        amount = order.total_amount
+    else:
+        purpose = "checkout"
+        discount = request.session.get("discount", 0)
+        quote_version = checkout_quote_version(
+            customer, discount, request.session.get("coupon_code")
+        )
+        amount = checkout_amount(customer, discount)
+        if amount < 1:
+            messages.error(request, "Your cart is empty!")
+            return redirect("checkout")
+
+    try:
+        gateway_order = open_gateway_order(
+            customer,
+            purpose,
+            amount,
+            quote_version=quote_version,
+            order_id=pay_now_order_id,
+            currency=currency,
+            receipt=str(request.user.id),
+        )
+    except GatewayUnavailable:
+        logger.exception("Razorpay order creation failed")
+        messages.error(request, "Payment gateway is unavailable. Please try again shortly.")
+        if pay_now_order_id:
+            return redirect("customer_orders")
+        return redirect("payment_failed")
+
+    razorpay_order_id = gateway_order.razorpay_order_id
+    amount = amount * 100
 
-    razorpay_order_id = razorpay_order["id"]
     callback_url = reverse("razorpay_paymenthandler")
     context = {
         "razorpay_order_id": razorpay_order_id,
@@ -48,9 +97,6 @@ def razorpay_order_creation(request, amount):
     return render(request, "customer/customer-payment.html", context=context)
 
 
-logger = logging.getLogger(__name__)
-
-
 
 
 @customer_required
@@ -65,44 +111,39 @@ def razorpay_paymenthandler(request):
         razorpay_order_id = request.POST.get("razorpay_order_id")
         razorpay_signature = request.POST.get("razorpay_signature")
 
-        razorpay_client.utility.verify_payment_signature({
+        get_gateway().verify_payment_signature({
             "razorpay_payment_id": razorpay_payment_id,
             "razorpay_order_id": razorpay_order_id,
             "razorpay_signature": razorpay_signature,
         })
 
-        # WALLET TOP-UP
-        if request.session.get("wallet_topup"):
-            amount = request.session.get("wallet_amount", 0)
-            wallet = Wallet.objects.get(customer=request.user.customer)
-
-            wallet.balance += amount
-            wallet.save()
+        # Webhooks may have settled this payment already; settling is idempotent.
+        gateway_order, newly_paid = settle_gateway_order(razorpay_order_id, razorpay_payment_id)
+        if gateway_order is None or gateway_order.customer_id != request.user.pk:
+            logger.error("Callback for unknown Razorpay order %s", razorpay_order_id)
+            messages.error(request, "Payment verification failed.")
+            return redirect("payment_failed")
 
-         
+        # WALLET TOP-UP
+        if gateway_order.purpose == "wallet_topup":
             request.session.pop("wallet_topup", None)
             request.session.pop("wallet_amount", None)
 
-            messages.success(request, f"₹{amount} added to wallet successfully.")
+            messages.success(request, f"₹{gateway_order.amount} added to wallet successfully.")
             return redirect("customer_wallet")
-        
-        if request.session.get("pay_now"):
-            order_id = request.session.get("order_id")
-            order = Order.objects.get(id=order_id)
 
-            # Mark order as paid
-            order.is_paid = True
-            order.payment_method = "razorpay"  # Payment method updated from COD to Razorpay
-            order.save()
-
-           
+        if gateway_order.purpose == "pay_now":
             request.session.pop("pay_now", None)
             request.session.pop("order_id", None)
 
             messages.success(request, "Payment completed successfully for your COD order!")
             return redirect("customer_orders")
 
-        
+        if not newly_paid and gateway_order.order_id:
+            # A replayed callback: this payment already has its order.
+            return redirect("order_confirmation", order_id=gateway_order.order_id)
+
+        request.session["razorpay_order_id"] = razorpay_order_id
         request.session["payment_successful"] = True
         request.session["payment_method"] = "razorpay"
         return redirect("finalize_order")
@@ -119,6 +160,39 @@ def razorpay_paymenthandler(request):
 
 
 
+@csrf_exempt
+def razorpay_webhook(request):
+    """
+    Razorpay webhook receiver: verify, persist and acknowledge immediately.
+
+    The events are settled later in batches by ``manage.py process_webhook_events``.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    try:
+        body = request.body.decode("utf-8")
+        get_gateway().verify_webhook_signature(
+            body, request.headers.get("X-Razorpay-Signature", "")
+        )
+        payload = json.loads(body)
+    except (razorpay.errors.SignatureVerificationError, ValueError):
+        # ValueError covers bodies that are not UTF-8 or not JSON.
+        return HttpResponseBadRequest("Invalid webhook")
+    if not isinstance(payload, dict):
+        return HttpResponseBadRequest("Invalid webhook")
+
+    event_id = (
+        request.headers.get("X-Razorpay-Event-Id")
+        or hashlib.sha256(request.body).hexdigest()
+    )
+    record_webhook(event_id, payload)
+    return HttpResponse(status=200)
+
+
+
+
+
 @customer_required
 def cash_on_delivery(request):
     """Mark upcoming order as COD in the session and finalize later."""
@@ -148,10 +222,10 @@ def handle_cod_payment(request, customer, total_amount):
 @customer_required
 def pay_now(request, order_id):
     """Start Razorpay payment flow for an existing COD order."""
-    order = get_object_or_404(Order, id=order_id, customer=request.user.customer)
+    order = get_object_or_404(Order, id=order_id, customer=get_request_customer(request))
     request.session["pay_now"] = "pay_now"
     request.session["order_id"] = order_id
-    return redirect("razorpay_order_creation", amount=order.total_amount)
+    return redirect("razorpay_order_creation")
 
 
 
@@ -159,16 +233,12 @@ def pay_now(request, order_id):
 
 
 def handle_wallet_payment(request, customer, total_amount):
-    wallet = Wallet.objects.get(customer=customer)
-    if wallet.balance >= total_amount:
-        with transaction.atomic():
-            wallet.balance -= total_amount
-            wallet.save()
-            request.session["payment_successful"] = True
-            request.session["payment_method"] = "wallet"
+    if debit_wallet(customer, total_amount, "payment"):
+        request.session["payment_successful"] = True
+        request.session["payment_method"] = "wallet"
         return redirect("finalize_order")
-    else:
-        messages.error(request, "Insufficient wallet balance.")
+
+    messages.error(request, "Insufficient wallet balance.")
     return redirect("payment_failed")
 
 
@@ -182,7 +252,7 @@ def wallet_retry_payment(request):
         messages.error(request, "Invalid payment data.")
         return redirect("checkout")
 
-    customer = request.user.customer
+    customer = get_request_customer(request)
 
     return handle_wallet_payment(request, customer, total_amount)
 
@@ -209,7 +279,7 @@ def payment_failed(request):
         messages.error(request, "Invalid order data. Please try again.")
         return redirect("checkout")
 
-    customer = request.user.customer
+    customer = get_request_customer(request)
     wallet = Wallet.objects.get(customer=customer)
 
     context = {
@@ -222,7 +292,7 @@ def payment_failed(request):
         retry_method = request.POST.get("retry_method")
 
         if retry_method == "razorpay":
-            return redirect("razorpay_order_creation", amount=total_amount)
+            return redirect("razorpay_order_creation")
         elif retry_method == "wallet":
             return handle_wallet_payment(request, customer, total_amount)
         elif retry_method == "cod":
@@ -0,0 +1,147 @@
+"""
+Payment settlement shared by the browser callback, Razorpay webhooks and the
+nightly reconciliation job.
+
+``settle_gateway_order`` is the single place that applies the effect of a
+captured payment. It locks the GatewayOrder row and only acts on the
+created -> paid transition, so whichever path sees the payment first wins
+and the others are no-ops.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from aadmin.widgets import invalidate_widgets_on_commit
+from customer.models import Order
+from customer.utils import credit_wallet
+
+from .models import GatewayOrder, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_EVENTS = {"payment.captured", "order.paid"}
+
+# How long a paid checkout may wait for its order before it is refunded.
+ORPHAN_GRACE = timedelta(hours=24)
+
+
+def settle_gateway_order(razorpay_order_id, razorpay_payment_id):
+    """
+    Mark a gateway order paid and apply its effect exactly once.
+
+    Returns ``(gateway_order, newly_paid)``; ``gateway_order`` is None when the
+    Razorpay order was not created by this site.
+    """
+    with transaction.atomic():
+        gateway_order = (
+            GatewayOrder.objects.select_for_update()
+            .select_related("customer")
+            .filter(razorpay_order_id=razorpay_order_id)
+            .first()
+        )
+        if gateway_order is None or gateway_order.status == "paid":
+            return gateway_order, False
+
+        gateway_order.status = "paid"
+        gateway_order.razorpay_payment_id = razorpay_payment_id
+        gateway_order.paid_at = timezone.now()
+        gateway_order.save(update_fields=["status", "razorpay_payment_id", "paid_at"])
+
+        if gateway_order.purpose == "wallet_topup":
+            credit_wallet(
+                gateway_order.customer,
+                gateway_order.amount,
+                "topup",
+                reference=razorpay_payment_id,
+            )
+        elif gateway_order.purpose == "pay_now" and gateway_order.order_id:
+            Order.objects.filter(id=gateway_order.order_id).update(
+                is_paid=True, payment_method="razorpay", updated_at=timezone.now()
+            )
+            invalidate_widgets_on_commit("orders")
+        # "checkout" orders are created by finalize_order in the browser flow;
+        # paid checkouts that never got an order are handled by reconciliation.
+
+    return gateway_order, True
+
+
+def record_webhook(event_id, payload):
+    """Store a verified webhook delivery; duplicates are ignored."""
+    WebhookEvent.objects.get_or_create(
+        event_id=event_id,
+        defaults={"event_type": payload.get("event", ""), "payload": payload},
+    )
+
+
+def _payment_entity(payload):
+    """``payload.payment.entity``, or {} if any level is missing or not an object."""
+    entity = payload
+    for key in ("payload", "payment", "entity"):
+        entity = entity.get(key) if isinstance(entity, dict) else None
+    return entity if isinstance(entity, dict) else {}
+
+
+def process_webhook_batch(batch_size=200):
+    """Settle one batch of stored webhook events; returns (processed, failed)."""
+    with transaction.atomic():
+        events = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, attempts__lt=10)
+            .order_by("id")[:batch_size]
+        )
+
+        processed_ids = []
+        failed = 0
+        for event in events:
+            if event.event_type not in PAYMENT_EVENTS:
+                processed_ids.append(event.id)
+                continue
+
+            payment = _payment_entity(event.payload)
+            try:
+                with transaction.atomic():
+                    settle_gateway_order(payment.get("order_id"), payment.get("id"))
+            except Exception as exc:
+                failed += 1
+                logger.exception("Webhook event %s failed", event.event_id)
+                WebhookEvent.objects.filter(id=event.id).update(
+                    attempts=event.attempts + 1, last_error=str(exc)[:2000]
+                )
+            else:
+                processed_ids.append(event.id)
+
+        WebhookEvent.objects.filter(id__in=processed_ids).update(
+            processed_at=timezone.now()
+        )
+    return len(processed_ids), failed
+
+
+def refund_orphaned_checkouts(older_than=ORPHAN_GRACE):
+    """
+    Credit the wallet for paid checkouts that never turned into an order
+    (e.g. the customer closed the tab after paying). Returns the count.
+    """
+    orphaned = GatewayOrder.objects.filter(
+        purpose="checkout",
+        status="paid",
+        order__isnull=True,
+        paid_at__lt=timezone.now() - older_than,
+    ).select_related("customer")
+
+    refunded = 0
+    for gateway_order in orphaned:
+        with transaction.atomic():
+            updated = GatewayOrder.objects.filter(
+                id=gateway_order.id, status="paid", order__isnull=True
+            ).update(status="refunded")
+            if updated:
+                credit_wallet(
+                    gateway_order.customer,
+                    gateway_order.amount,
+                    "refund",
+                    reference=gateway_order.razorpay_payment_id,
+                )
+                refunded += 1
+    return refunded
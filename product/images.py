@@ -0,0 +1,35 @@
+"""
+Product image processing.
+
+Kept free of Django imports so ``process_image`` can run in worker
+processes (see aadmin/catalog_import.py) without setting Django up.
+"""
+from PIL import Image
+
+IMAGE_SIZE = 400
+
+
+def crop_square(img, size=IMAGE_SIZE):
+    """Centre-crop ``img`` to a square and resize it to ``size`` x ``size``."""
+    min_dim = min(img.size)
+    crop_box = (
+        (img.width - min_dim) // 2,
+        (img.height - min_dim) // 2,
+        (img.width + min_dim) // 2,
+        (img.height + min_dim) // 2,
+    )
+    return img.crop(crop_box).resize((size, size), Image.LANCZOS)
+
+
+def process_image(task):
+    """Write a cropped copy of ``source`` to ``destination``; returns an error message or None."""
+    source, destination = task
+    try:
+        with Image.open(source) as img:
+            cropped = crop_square(img)
+        if cropped.mode not in ("RGB", "L") and destination.lower().endswith((".jpg", ".jpeg")):
+            cropped = cropped.convert("RGB")
+        cropped.save(destination)
+    except Exception as exc:
+        return str(exc) or exc.__class__.__name__
+    return None
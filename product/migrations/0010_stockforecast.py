@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-19 17:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0009_alter_product_main_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockForecast',
+            fields=[
+                ('inventory', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='forecast', serialize=False, to='product.inventory')),
+                ('daily_demand', models.FloatField(default=0)),
+                ('days_of_cover', models.FloatField(blank=True, db_index=True, null=True)),
+                ('reorder_quantity', models.PositiveIntegerField(db_index=True, default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
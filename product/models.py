@@ -3,6 +3,8 @@ from django.core.validators import MinValueValidator
 from ecom.models import SoftDeleteModel, ApprovedProductManager
 from PIL import Image
 
+from .images import crop_square
+
 
 class Category(SoftDeleteModel):
     name = models.CharField(max_length=50, unique=True)
@@ -68,18 +70,8 @@ class ProductImage(models.Model):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
 
-        img = Image.open(self.image.path)
-        min_dim = min(img.size)
-        crop_box = (
-            (img.width - min_dim) // 2,
-            (img.height - min_dim) // 2,
-            (img.width + min_dim) // 2,
-            (img.height + min_dim) // 2,
-        )
-        img = img.crop(crop_box)
-
-        img = img.resize((400, 400), Image.LANCZOS)
-
+        with Image.open(self.image.path) as img:
+            img = crop_square(img)
         img.save(self.image.path)
 
 
@@ -105,3 +97,22 @@ class Inventory(models.Model):
     class Meta:
         verbose_name_plural = "Inventory"
 
+
+
+class StockForecast(models.Model):
+    """
+    Demand forecast per inventory SKU, written by ``manage.py forecast_demand``
+    (aadmin/forecasting.py). ``days_of_cover`` is empty when there is no
+    recent demand.
+    """
+
+    inventory = models.OneToOneField(
+        Inventory, on_delete=models.CASCADE, primary_key=True, related_name="forecast"
+    )
+    daily_demand = models.FloatField(default=0)
+    days_of_cover = models.FloatField(null=True, blank=True, db_index=True)
+    reorder_quantity = models.PositiveIntegerField(default=0, db_index=True)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.inventory_id}: {self.daily_demand:.2f}/day"